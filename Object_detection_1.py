@@ -1,18 +1,48 @@
 # Object_detection_1.py
 import os
+import time
 import cv2
+import numpy as np
+import torch
 from ultralytics import YOLO
 
+from detector_runtimes import export_model, load_runtime_config
+from preprocessing import AdaptiveInputSize, LetterboxPreprocessor
+
 
 class VideoPersonDetector:
-    def __init__(self, input_video="Sample_Video.mp4", output_video="Sample_Video_Detected.mp4", model_path="yolov8n.pt"):
+    def __init__(self, input_video="Sample_Video.mp4", output_video="Sample_Video_Detected.mp4", model_path="yolov8n.pt",
+                 device=None, runtime=None, classes=("person",), imgsz=640, preprocess=False,
+                 adaptive_imgsz=False, latency_budget=None):
         # --- Paths ---
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.input_path = os.path.join(self.base_dir, input_video)
-        self.output_path = os.path.join(self.base_dir, output_video)
+        self.output_path = os.path.join(self.base_dir, output_video) if output_video else None
+        self.device = device
+
+        # --- Load YOLO model (PyTorch, or an exported ONNX / OpenVINO runtime, see detector_runtimes.py) ---
+        self.runtime = load_runtime_config(runtime)
+        self.imgsz = imgsz
+        if self.runtime["backend"] != "pytorch":
+            # exported graphs have a static input size
+            self.imgsz = self.runtime["imgsz"]
+            adaptive_imgsz = False
+            model_path = export_model(model_path, self.runtime, calibration_video=self.input_path)
+        if self.imgsz <= 0 or self.imgsz % 32:
+            raise ValueError(f"imgsz must be a positive multiple of the model stride (32), got {self.imgsz}")
+        self.model = YOLO(model_path, task="detect")
 
-        # --- Load YOLO model ---
-        self.model = YOLO(model_path)
+        # --- Preprocessing (reused letterbox buffers) and per-stream adaptive input size, see preprocessing.py ---
+        # exported graphs take a static square input; PyTorch models take the stride-aligned rectangle
+        self.preprocessor = LetterboxPreprocessor(auto=self.runtime["backend"] == "pytorch") if preprocess else None
+        self.input_size = None
+        if adaptive_imgsz:
+            sizes = [s for s in (320, 416, 512, 640, 800, 960) if s < self.imgsz] + [self.imgsz]
+            self.input_size = AdaptiveInputSize(sizes=sizes, initial=self.imgsz, latency_budget=latency_budget)
+
+        # --- Classes to keep (names or ids; None keeps every class), resolved once to ids ---
+        self.class_names = dict(self.model.names)
+        self.class_ids = None if classes is None else self._resolve_class_ids(classes)
 
         # --- Video Capture ---
         self.cap = cv2.VideoCapture(self.input_path)
@@ -26,8 +56,10 @@ class VideoPersonDetector:
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.fourcc = cv2.VideoWriter_fourcc(*"mp4v")
 
-        # --- Output Writer ---
-        self.out = cv2.VideoWriter(self.output_path, self.fourcc, self.fps, (self.width, self.height))
+        # --- Output Writer (optional, callers may bring their own sinks) ---
+        self.out = None
+        if self.output_path is not None:
+            self.out = cv2.VideoWriter(self.output_path, self.fourcc, self.fps, (self.width, self.height))
 
     def get_video_info(self):
         return {
@@ -38,26 +70,64 @@ class VideoPersonDetector:
             "output_path": self.output_path
         }
 
+    def _resolve_class_ids(self, classes):
+        name_to_id = {name: idx for idx, name in self.class_names.items()}
+        class_ids = []
+        for c in classes:
+            if isinstance(c, str):
+                if c not in name_to_id:
+                    raise ValueError(f"Unknown class '{c}'. Available: {', '.join(name_to_id)}")
+                class_ids.append(name_to_id[c])
+            else:
+                class_ids.append(int(c))
+        return np.array(class_ids, dtype=int)
+
     def detect_frame(self, frame):
-        """Return YOLO detections for a single frame."""
-        results = self.model.predict(source=frame, verbose=False, stream=True)
-        detections = []
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                label_name = self.model.names[cls]
-                if label_name != "person":
-                    continue
-                
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                detections.append([x1, y1, x2, y2, conf])
-                
+        """Return YOLO detections for a single frame as an (N, 6) array of [x1, y1, x2, y2, conf, class_id]."""
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        """Run YOLO once on a list of frames and return one detection array per frame."""
+        imgsz = self.input_size.size if self.input_size is not None else self.imgsz
+        start = time.perf_counter()
+        if self.preprocessor is None:
+            # ultralytics letterboxes / normalizes each frame itself (new tensors every call)
+            results = self.model.predict(source=list(frames), verbose=False, device=self.device, imgsz=imgsz)
+            geometries = [None] * len(frames)
+        else:
+            tensor, geometries = self.preprocessor(frames, imgsz)
+            results = self.model.predict(source=torch.from_numpy(tensor), verbose=False, device=self.device,
+                                         imgsz=imgsz)
+        latency = (time.perf_counter() - start) / len(frames)
+
+        detections = [self._parse_result(r, g, f.shape) for r, g, f in zip(results, geometries, frames)]
+        if self.input_size is not None:
+            for dets, frame in zip(detections, frames):
+                gain = min(imgsz / frame.shape[0], imgsz / frame.shape[1])   # same fit as both letterbox paths
+                self.input_size.update(latency, dets[:, 3] - dets[:, 1], gain)
         return detections
 
+    def _parse_result(self, result, geometry=None, frame_shape=None):
+        """
+        Keep the configured classes of a single YOLO result with one vectorized mask on the class tensor.
+        Boxes predicted on a letterboxed tensor are mapped back to frame coordinates with `geometry`.
+        """
+        boxes = result.boxes
+        if len(boxes) == 0:
+            return np.empty((0, 6))
+        cls = boxes.cls.cpu().numpy().astype(int)
+        keep = np.ones(len(cls), dtype=bool) if self.class_ids is None else np.isin(cls, self.class_ids)
+
+        xyxy = boxes.xyxy.cpu().numpy()[keep]
+        if geometry is not None:
+            xyxy = LetterboxPreprocessor.to_frame_coords(xyxy, geometry, frame_shape)
+        conf = boxes.conf.cpu().numpy()[keep]
+        return np.column_stack((np.trunc(xyxy), conf, cls[keep])).astype(float)
+
     def cleanup(self):
         self.cap.release()
-        self.out.release()
+        if self.out is not None:
+            self.out.release()
         cv2.destroyAllWindows()
 
     def get_video_stream(self):
@@ -0,0 +1,316 @@
+"""
+detector_runtimes.py
+--------------------
+Exported / INT8-quantized YOLOv8 runtimes for CPU-only inference.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    `VideoPersonDetector` (Object_detection_1.py) runs YOLOv8 in PyTorch eager mode
+    by default. This module exports the same weights to ONNX Runtime or OpenVINO,
+    optionally quantizes them to INT8 using calibration frames sampled from a video,
+    and produces an accuracy/throughput report against the PyTorch path on the same video.
+
+    A runtime is described by a small config (dict or JSON file):
+
+        {"backend": "openvino", "int8": true, "imgsz": 640, "calibration_frames": 100}
+
+    Usage:
+        python detector_runtimes.py --video Sample_Video.mp4 --backends onnx openvino --int8 --frames 300
+
+Dependencies:
+    pip install ultralytics opencv-python numpy scipy
+    pip install onnx onnxruntime        # backend "onnx"
+    pip install openvino nncf           # backend "openvino"
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import cv2
+import numpy as np
+
+BACKENDS = ("pytorch", "onnx", "openvino")
+
+DEFAULT_RUNTIME = {
+    "backend": "pytorch",
+    "int8": False,
+    "imgsz": 640,
+    "calibration_frames": 100,
+    "export_dir": None,
+}
+
+
+def load_runtime_config(config=None):
+    """Return a full runtime config from None, a backend name, a dict or a JSON file path."""
+    runtime = dict(DEFAULT_RUNTIME)
+    if config is None:
+        return runtime
+    if isinstance(config, str):
+        if config.endswith(".json"):
+            with open(config) as f:
+                config = json.load(f)
+        else:
+            config = {"backend": config}
+    runtime.update(config)
+    if runtime["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown detector backend '{runtime['backend']}'. Available: {', '.join(BACKENDS)}")
+    if runtime["int8"] and runtime["backend"] == "pytorch":
+        raise ValueError("INT8 quantization requires an exported backend (onnx or openvino)")
+    return runtime
+
+
+# --- Preprocessing shared by calibration (must match ultralytics' letterbox) ---
+
+def letterbox(frame, imgsz=640, color=(114, 114, 114)):
+    """Resize keeping aspect ratio and pad to a square `imgsz` canvas."""
+    h, w = frame.shape[:2]
+    gain = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * gain)), int(round(h * gain))
+    pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+    canvas = np.full((imgsz, imgsz, 3), color, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h),
+                                                                  interpolation=cv2.INTER_LINEAR)
+    return canvas
+
+
+def to_input_tensor(image):
+    """BGR uint8 HWC -> RGB float32 1x3xHxW in [0, 1]."""
+    return np.ascontiguousarray(image[..., ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def sample_calibration_frames(video_path, num_frames=100, imgsz=640):
+    """Evenly sample `num_frames` frames from a video as model input tensors."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video file: {video_path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    tensors = []
+    for idx in np.linspace(0, max(total - 1, 0), num_frames).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+        ret, frame = cap.read()
+        if ret:
+            tensors.append(to_input_tensor(letterbox(frame, imgsz)))
+    cap.release()
+    if not tensors:
+        raise RuntimeError(f"No calibration frames could be read from {video_path}")
+    return tensors
+
+
+# --- Export & quantization ---
+
+def _export_dir(model_path, runtime):
+    return runtime["export_dir"] or os.path.dirname(os.path.abspath(model_path))
+
+
+def _quantize_onnx(fp32_path, int8_path, calibration):
+    from onnxruntime import InferenceSession
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class FrameCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(calibration)
+
+        def get_next(self):
+            tensor = next(self._frames, None)
+            return None if tensor is None else {input_name: tensor}
+
+    quantize_static(fp32_path, int8_path, FrameCalibrationReader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+    return int8_path
+
+
+def _quantize_openvino(fp32_dir, int8_dir, calibration):
+    import nncf
+    import openvino as ov
+
+    xml_name = next(name for name in os.listdir(fp32_dir) if name.endswith(".xml"))
+    ov_model = ov.Core().read_model(os.path.join(fp32_dir, xml_name))
+    quantized = nncf.quantize(ov_model, nncf.Dataset(calibration), preset=nncf.QuantizationPreset.MIXED,
+                              subset_size=len(calibration))
+    os.makedirs(int8_dir, exist_ok=True)
+    ov.save_model(quantized, os.path.join(int8_dir, xml_name))
+    # ultralytics reads class names / stride / imgsz from metadata.yaml next to the model
+    metadata = os.path.join(fp32_dir, "metadata.yaml")
+    if os.path.exists(metadata):
+        shutil.copy(metadata, int8_dir)
+    return int8_dir
+
+
+def export_model(model_path, runtime, calibration_video=None):
+    """
+    Export `model_path` for the configured backend (cached on disk) and return the path YOLO() should load.
+    INT8 needs `calibration_video` to sample calibration frames from.
+    """
+    runtime = load_runtime_config(runtime)
+    if runtime["backend"] == "pytorch":
+        return model_path
+
+    from ultralytics import YOLO
+
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    out_dir = _export_dir(model_path, runtime)
+    imgsz = runtime["imgsz"]
+    if runtime["backend"] == "onnx":
+        fp32_path = os.path.join(out_dir, f"{stem}_{imgsz}.onnx")
+        int8_path = os.path.join(out_dir, f"{stem}_{imgsz}_int8.onnx")
+    else:
+        fp32_path = os.path.join(out_dir, f"{stem}_{imgsz}_openvino_model")
+        int8_path = os.path.join(out_dir, f"{stem}_{imgsz}_int8_openvino_model")
+
+    target = int8_path if runtime["int8"] else fp32_path
+    if os.path.exists(target):
+        return target
+
+    if not os.path.exists(fp32_path):
+        exported = YOLO(model_path).export(format=runtime["backend"], imgsz=imgsz, dynamic=False, half=False)
+        shutil.move(str(exported), fp32_path)
+
+    if not runtime["int8"]:
+        return fp32_path
+
+    if calibration_video is None:
+        raise ValueError("INT8 quantization needs a calibration video")
+    calibration = sample_calibration_frames(calibration_video, runtime["calibration_frames"], imgsz)
+    if runtime["backend"] == "onnx":
+        return _quantize_onnx(fp32_path, int8_path, calibration)
+    return _quantize_openvino(fp32_path, int8_path, calibration)
+
+
+# --- Accuracy / throughput comparison ---
+
+def _pairwise_iou(a, b):
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:4] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:4] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def agreement(reference, candidate, iou_threshold=0.5):
+    """Match one frame's candidate boxes to the reference boxes; returns (matches, mean IoU of matches)."""
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0, 0.0
+    from scipy.optimize import linear_sum_assignment
+
+    iou = _pairwise_iou(reference[:, :4], candidate[:, :4])
+    rows, cols = linear_sum_assignment(-iou)
+    matched = iou[rows, cols] >= iou_threshold
+    return int(matched.sum()), float(iou[rows, cols][matched].sum())
+
+
+def _read_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video file: {video_path}")
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _run_detector(detector, frames):
+    detector.detect_frame(frames[0])  # warm-up (graph compilation, allocator)
+    detections, start = [], time.perf_counter()
+    for frame in frames:
+        detections.append(detector.detect_frame(frame))
+    return detections, len(frames) / (time.perf_counter() - start)
+
+
+def compare_runtimes(video, runtimes, model_path="yolov8n.pt", max_frames=300, iou_threshold=0.5):
+    """
+    Run the PyTorch detector and every runtime in `runtimes` on the same frames.
+    Returns one row per runtime with FPS, speed-up and precision/recall/F1 against PyTorch, and the
+    number of frames actually compared (fewer than `max_frames` on a short video).
+    """
+    from Object_detection_1 import VideoPersonDetector
+
+    def build(runtime):
+        return VideoPersonDetector(input_video=video, output_video=None, model_path=model_path, runtime=runtime)
+
+    reference_detector = build(None)
+    frames = _read_frames(reference_detector.input_path, max_frames)
+    reference, reference_fps = _run_detector(reference_detector, frames)
+    reference_detector.cleanup()
+    n_reference = sum(len(r) for r in reference)
+
+    rows = [{"runtime": "pytorch", "fps": reference_fps, "speedup": 1.0,
+             "precision": 1.0, "recall": 1.0, "f1": 1.0, "mean_iou": 1.0}]
+    for runtime in runtimes:
+        runtime = load_runtime_config(runtime)
+        detector = build(runtime)
+        candidate, fps = _run_detector(detector, frames)
+        detector.cleanup()
+
+        matches, iou_sum = 0, 0.0
+        for ref, cand in zip(reference, candidate):
+            m, s = agreement(ref, cand, iou_threshold)
+            matches += m
+            iou_sum += s
+        n_candidate = sum(len(c) for c in candidate)
+        precision = matches / n_candidate if n_candidate else 0.0
+        recall = matches / n_reference if n_reference else 0.0
+        rows.append({
+            "runtime": runtime["backend"] + ("-int8" if runtime["int8"] else "-fp32"),
+            "fps": fps,
+            "speedup": fps / reference_fps,
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            "mean_iou": iou_sum / matches if matches else 0.0,
+        })
+    return rows, len(frames)
+
+
+def format_report(rows, video, n_frames):
+    lines = [
+        f"### Detector runtime comparison ({video}, {n_frames} frames, reference = PyTorch)",
+        "",
+        "| Runtime | FPS | Speed-up | Precision | Recall | F1 | Mean IoU |",
+        "|---------|-----|----------|-----------|--------|----|----------|",
+    ]
+    for r in rows:
+        lines.append(f"| {r['runtime']} | {r['fps']:.2f} | {r['speedup']:.2f}x | {r['precision']:.3f} | "
+                     f"{r['recall']:.3f} | {r['f1']:.3f} | {r['mean_iou']:.3f} |")
+    return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export / quantize YOLOv8 and compare against PyTorch")
+    parser.add_argument("--video", default="Sample_Video.mp4", help="Video used for calibration and comparison")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO weights [yolov8n.pt]")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "openvino"], choices=BACKENDS[1:])
+    parser.add_argument("--int8", action="store_true", help="Also benchmark INT8-quantized variants")
+    parser.add_argument("--imgsz", type=int, default=640, help="Export input size [640]")
+    parser.add_argument("--calibration-frames", type=int, default=100, help="Frames used for INT8 calibration")
+    parser.add_argument("--frames", type=int, default=300, help="Frames used for the comparison [300]")
+    parser.add_argument("--report", default=None, help="Write the Markdown report to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    runtimes = []
+    for backend in args.backends:
+        for int8 in ((False, True) if args.int8 else (False,)):
+            runtimes.append({"backend": backend, "int8": int8, "imgsz": args.imgsz,
+                             "calibration_frames": args.calibration_frames})
+
+    rows, n_frames = compare_runtimes(args.video, runtimes, model_path=args.model, max_frames=args.frames)
+    report = format_report(rows, args.video, n_frames)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report + "\n")
+        print(f"\nReport saved at: {args.report}")
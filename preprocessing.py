@@ -0,0 +1,257 @@
+"""
+preprocessing.py
+----------------
+Letterbox preprocessing into reused buffers and per-stream adaptive input size for YOLOv8.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Passing raw BGR frames to `model.predict` makes ultralytics allocate a new
+    resized, letterboxed and normalized tensor on every call. Instead,
+    `VideoPersonDetector` (Object_detection_1.py) owns:
+
+        - `LetterboxPreprocessor`: one preallocated uint8 canvas and float32
+          NCHW tensor per (canvas size, batch size). Frames are resized directly
+          into the canvas, normalized into the tensor in place, and output boxes
+          are mapped back to frame coordinates in one vectorized step. Like
+          ultralytics' own letterbox for PyTorch models, the canvas is only
+          padded to the smallest stride multiple around the resized frame, so a
+          720p frame at imgsz 640 becomes a 384x640 input, not 640x640.
+          Exported graphs with a static input shape use the square canvas
+          (`auto=False`).
+        - `AdaptiveInputSize`: picks the inference input size per stream from a
+          list of candidates, based on the apparent size of the tracked objects
+          and a latency budget.
+
+    The stage is opt-in (`preprocess=True`). Ultralytics converts a tensor
+    source back to uint8 images for postprocessing, so the end-to-end gain
+    depends on the setup; measure it with `--video` below before enabling it.
+    tracemalloc only sees NumPy / OpenCV buffers, not torch tensors, so the
+    detector comparison reports latency only.
+
+    Usage (allocation / latency before and after):
+        python preprocessing.py                              # preprocessing only, no model needed
+        python preprocessing.py --video Sample_Video.mp4     # full detector, raw frames vs. buffers
+
+Dependencies:
+    pip install opencv-python numpy (torch / ultralytics for the detector comparison)
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+
+class LetterboxPreprocessor:
+    def __init__(self, pad_value=114, stride=32, auto=True):
+        """
+        stride : model stride; input sides are padded to multiples of it
+        auto   : pad to the smallest stride-aligned rectangle (False: square `imgsz` canvas for static graphs)
+        """
+        self.pad_value = pad_value
+        self.stride = stride
+        self.auto = auto
+        self._buffers = {}      # (canvas_h, canvas_w, batch) -> {"canvas", "tensor", "geometry"}
+        self._geometries = {}   # (h, w, imgsz) -> (gain, pad_x, pad_y, new_w, new_h, canvas_w, canvas_h)
+
+    def geometry(self, frame_shape, imgsz):
+        """Scale, padding and canvas size that fit a frame into `imgsz` (cached per resolution)."""
+        key = (frame_shape[0], frame_shape[1], imgsz)
+        if key not in self._geometries:
+            h, w = key[:2]
+            gain = min(imgsz / h, imgsz / w)
+            new_w, new_h = int(round(w * gain)), int(round(h * gain))
+            if self.auto:
+                canvas_w = -(-new_w // self.stride) * self.stride
+                canvas_h = -(-new_h // self.stride) * self.stride
+            else:
+                canvas_w = canvas_h = imgsz
+            self._geometries[key] = (gain, (canvas_w - new_w) // 2, (canvas_h - new_h) // 2, new_w, new_h,
+                                     canvas_w, canvas_h)
+        return self._geometries[key]
+
+    def _buffer(self, canvas_h, canvas_w, batch):
+        key = (canvas_h, canvas_w, batch)
+        if key not in self._buffers:
+            self._buffers[key] = {
+                "canvas": np.full((batch, canvas_h, canvas_w, 3), self.pad_value, dtype=np.uint8),
+                "tensor": np.empty((batch, 3, canvas_h, canvas_w), dtype=np.float32),
+                "geometry": [None] * batch,
+            }
+        return self._buffers[key]
+
+    def __call__(self, frames, imgsz):
+        """
+        Letterbox + normalize `frames` (BGR uint8) into the reused float32 (B, 3, H, W) RGB tensor.
+        Returns the tensor (valid until the next call with the same size) and one geometry per frame.
+        """
+        geometries = [self.geometry(frame.shape, imgsz) for frame in frames]
+        canvas_w, canvas_h = max(g[5] for g in geometries), max(g[6] for g in geometries)
+        # frames of different resolutions in one batch are centred on the batch's largest canvas
+        geometries = [(gain, (canvas_w - new_w) // 2, (canvas_h - new_h) // 2, new_w, new_h, canvas_w, canvas_h)
+                      for gain, _, _, new_w, new_h, _, _ in geometries]
+        buf = self._buffer(canvas_h, canvas_w, len(frames))
+        canvas, tensor = buf["canvas"], buf["tensor"]
+        for i, (frame, geometry) in enumerate(zip(frames, geometries)):
+            _, pad_x, pad_y, new_w, new_h = geometry[:5]
+            if buf["geometry"][i] != geometry:
+                canvas[i].fill(self.pad_value)  # padding only changes with the frame resolution
+                buf["geometry"][i] = geometry
+
+            view = canvas[i, pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+            resized = cv2.resize(frame, (new_w, new_h), dst=view, interpolation=cv2.INTER_LINEAR)
+            if not np.shares_memory(resized, view):
+                view[...] = resized
+            # BGR -> RGB, HWC -> CHW and / 255 in one pass into the preallocated tensor
+            np.multiply(canvas[i, :, :, ::-1].transpose(2, 0, 1), np.float32(1 / 255), out=tensor[i],
+                        dtype=np.float32)
+        return tensor, geometries
+
+    @staticmethod
+    def to_frame_coords(xyxy, geometry, frame_shape):
+        """Map (N, 4) boxes from letterboxed input coordinates back to the original frame, clipped."""
+        gain, pad_x, pad_y = geometry[:3]
+        boxes = (xyxy - np.array([pad_x, pad_y, pad_x, pad_y], dtype=xyxy.dtype)) / gain
+        np.clip(boxes[:, 0::2], 0, frame_shape[1], out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, frame_shape[0], out=boxes[:, 1::2])
+        return boxes
+
+
+class AdaptiveInputSize:
+    def __init__(self, sizes=(320, 416, 512, 640), initial=None, min_object_px=32, latency_budget=None,
+                 window=30, min_observations=10):
+        """
+        sizes            : candidate input sizes (multiples of 32), smallest to largest
+        initial          : starting size, added to `sizes` when missing [largest candidate]
+        min_object_px    : keep the small objects (10th percentile height) at least this tall in the input
+        latency_budget   : target inference latency per frame in seconds (None = no latency constraint)
+        window           : frames between decisions
+        min_observations : frames with detections a window needs before object size may change the input size
+        """
+        self.sizes = sorted(set(sizes) | ({initial} if initial is not None else set()))
+        self.index = self.sizes.index(initial) if initial is not None else len(self.sizes) - 1
+        self.min_object_px = min_object_px
+        self.latency_budget = latency_budget
+        self.window = window
+        self.min_observations = min_observations
+
+        self._latency = None    # exponential moving average, seconds per frame
+        self._heights = []      # 10th-percentile object height per frame, in frame pixels
+        self._frames = 0
+
+    @property
+    def size(self):
+        return self.sizes[self.index]
+
+    def update(self, latency, box_heights, gain):
+        """Record one frame (inference latency, box heights in frame pixels, frame->input gain); maybe resize."""
+        self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+        if len(box_heights):
+            self._heights.append(float(np.percentile(box_heights, 10)) * gain / self.size)
+        self._frames += 1
+        if self._frames < self.window:
+            return self.size
+
+        # object height per input pixel; scaling the input by s scales objects by s. An empty scene says
+        # nothing about object size, so only the latency budget can shrink the input then.
+        small_object = np.median(self._heights) if len(self._heights) >= self.min_observations else None
+        over_budget = self.latency_budget is not None and self._latency > self.latency_budget
+        if self.index > 0:
+            smaller = self.sizes[self.index - 1]
+            fits_smaller = small_object is not None and small_object * smaller >= self.min_object_px
+            if over_budget or fits_smaller:
+                self.index -= 1
+        if not over_budget and small_object is not None and self.index < len(self.sizes) - 1 \
+                and small_object * self.size < self.min_object_px:
+            bigger = self.sizes[self.index + 1]
+            predicted = self._latency * (bigger / self.size) ** 2
+            if self.latency_budget is None or predicted <= self.latency_budget:
+                self.index += 1
+
+        self._heights, self._frames = [], 0
+        return self.size
+
+
+def stride_multiple(value, stride=32):
+    """argparse type for input sizes: a positive multiple of the model stride."""
+    size = int(value)
+    if size <= 0 or size % stride:
+        raise argparse.ArgumentTypeError(f"input size must be a positive multiple of {stride}, got {value}")
+    return size
+
+
+# --- Measurements ---
+
+def _measure(fn, iterations, trace=True):
+    """Mean latency (ms) and mean transient peak of traced allocations (KB, None if `trace` is off) per call."""
+    fn()  # warm-up (buffer allocation, caches)
+    if not trace:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return 1000 * (time.perf_counter() - start) / iterations, None
+    tracemalloc.start()
+    latency, peak = 0.0, 0
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        fn()
+        latency += time.perf_counter() - start
+        peak += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return 1000 * latency / iterations, peak / iterations / 1024
+
+
+def benchmark_preprocessing(frame_shape=(360, 640, 3), imgsz=640, batch=1, iterations=200):
+    """Allocating letterbox (as in ultralytics / detector_runtimes.py) vs. the reused-buffer preprocessor."""
+    from detector_runtimes import letterbox, to_input_tensor
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, frame_shape, dtype=np.uint8) for _ in range(batch)]
+    square, rectangle = LetterboxPreprocessor(auto=False), LetterboxPreprocessor()
+
+    def allocating():
+        return np.concatenate([to_input_tensor(letterbox(f, imgsz)) for f in frames])
+
+    return {"allocating letterbox (square)": _measure(allocating, iterations),
+            "LetterboxPreprocessor (square)": _measure(lambda: square(frames, imgsz), iterations),
+            "LetterboxPreprocessor (stride)": _measure(lambda: rectangle(frames, imgsz), iterations)}
+
+
+def compare_detector_paths(video, model_path="yolov8n.pt", frames=200):
+    """Detector latency with raw frames handed to ultralytics vs. the preprocessing stage (torch is not traced)."""
+    from Object_detection_1 import VideoPersonDetector
+
+    results = {}
+    for title, preprocess in (("raw frames -> model.predict", False), ("LetterboxPreprocessor", True)):
+        detector = VideoPersonDetector(input_video=video, output_video=None, model_path=model_path,
+                                       preprocess=preprocess)
+        ret, frame = detector.cap.read()
+        if not ret:
+            raise RuntimeError(f"Could not read a frame from {video}")
+        results[title] = _measure(lambda: detector.detect_frame(frame), frames, trace=False)
+        detector.cleanup()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocessing allocation / latency before and after")
+    parser.add_argument("--video", default=None, help="Also compare the full detector on this video")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO weights [yolov8n.pt]")
+    parser.add_argument("--imgsz", type=stride_multiple, default=640)
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    report = benchmark_preprocessing(imgsz=args.imgsz, batch=args.batch, iterations=args.iterations)
+    if args.video:
+        report.update(compare_detector_paths(args.video, args.model, args.iterations))
+    print("Per-call latency and transient allocation peak (NumPy / OpenCV buffers traced by tracemalloc; "
+          "torch allocations are not visible, n/a for the detector):")
+    for title, (ms, kb) in report.items():
+        print(f"  - {title:<31}: {ms:8.3f} ms  " + (f"{kb:10.1f} KB" if kb is not None else "       n/a"))
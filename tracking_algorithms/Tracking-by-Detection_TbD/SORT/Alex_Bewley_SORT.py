@@ -19,17 +19,15 @@ from __future__ import print_function
 
 import os
 import numpy as np
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from skimage import io
 
 import glob
 import time
 import argparse
+from collections import deque
 from filterpy.kalman import KalmanFilter
 
+import association_kernels
+
 np.random.seed(0)
 
 
@@ -47,20 +45,9 @@ def linear_assignment(cost_matrix):
 def iou_batch(bb_test, bb_gt):
   """
   From SORT: Computes IOU between two bboxes in the form [x1,y1,x2,y2]
+  (fused Numba kernel or in-place NumPy path, see association_kernels.py)
   """
-  bb_gt = np.expand_dims(bb_gt, 0)
-  bb_test = np.expand_dims(bb_test, 1)
-  
-  xx1 = np.maximum(bb_test[..., 0], bb_gt[..., 0])
-  yy1 = np.maximum(bb_test[..., 1], bb_gt[..., 1])
-  xx2 = np.minimum(bb_test[..., 2], bb_gt[..., 2])
-  yy2 = np.minimum(bb_test[..., 3], bb_gt[..., 3])
-  w = np.maximum(0., xx2 - xx1)
-  h = np.maximum(0., yy2 - yy1)
-  wh = w * h
-  o = wh / ((bb_test[..., 2] - bb_test[..., 0]) * (bb_test[..., 3] - bb_test[..., 1])                                      
-    + (bb_gt[..., 2] - bb_gt[..., 0]) * (bb_gt[..., 3] - bb_gt[..., 1]) - wh)                                              
-  return(o)  
+  return association_kernels.iou_batch(bb_test, bb_gt)
 
 
 def convert_bbox_to_z(bbox):
@@ -95,10 +82,11 @@ class KalmanBoxTracker(object):
   """
   This class represents the internal state of individual tracked objects observed as bbox.
   """
-  count = 0
-  def __init__(self,bbox):
+  max_history = 32  # predicted boxes kept while unmatched (the history is bounded for long-lived tracks)
+
+  def __init__(self,bbox,track_id):
     """
-    Initialises a tracker using initial bounding box.
+    Initialises a tracker using initial bounding box and the ID allocated by the owning Sort instance.
     """
     #define constant velocity model
     self.kf = KalmanFilter(dim_x=7, dim_z=4) 
@@ -112,10 +100,10 @@ class KalmanBoxTracker(object):
     self.kf.Q[4:,4:] *= 0.01
 
     self.kf.x[:4] = convert_bbox_to_z(bbox)
+    self.cls = int(bbox[5]) if len(bbox) > 5 else 0
     self.time_since_update = 0
-    self.id = KalmanBoxTracker.count
-    KalmanBoxTracker.count += 1
-    self.history = []
+    self.id = track_id
+    self.history = deque(maxlen=self.max_history)
     self.hits = 0
     self.hit_streak = 0
     self.age = 0
@@ -125,7 +113,7 @@ class KalmanBoxTracker(object):
     Updates the state vector with observed bbox.
     """
     self.time_since_update = 0
-    self.history = []
+    self.history.clear()
     self.hits += 1
     self.hit_streak += 1
     self.kf.update(convert_bbox_to_z(bbox))
@@ -150,73 +138,83 @@ class KalmanBoxTracker(object):
     """
     return convert_x_to_bbox(self.kf.x)
 
+  @classmethod
+  def from_snapshot(cls, x, P, counters, history):
+    """
+    Rebuilds a tracker from a snapshot row (see Sort.state_dict): Kalman state x (7,), covariance P (7,7),
+    counters [id, cls, time_since_update, hits, hit_streak, age] and predicted-box history (k,4).
+    The constant filter matrices (F, H, Q, R) are recreated by __init__.
+    """
+    trk = cls(np.array([0., 0., 1., 1.]), int(counters[0]))
+    trk.kf.x = np.asarray(x, dtype=float).reshape((7, 1)).copy()
+    trk.kf.P = np.asarray(P, dtype=float).copy()
+    trk.id, trk.cls, trk.time_since_update, trk.hits, trk.hit_streak, trk.age = (int(v) for v in counters)
+    trk.history.extend(h.reshape((1, 4)) for h in history)
+    return trk
+
 
 def associate_detections_to_trackers(detections,trackers,iou_threshold = 0.3):
   """
   Assigns detections to tracked object (both represented as bounding boxes)
 
-  Returns 3 lists of matches, unmatched_detections and unmatched_trackers
+  IOU, thresholding and the unmatched sets are computed by association_kernels.py
+  (Numba when installed, vectorized NumPy otherwise) with the same results and ordering
+  as the original per-index loops.
+
+  Returns 3 arrays of matches, unmatched_detections and unmatched_trackers
   """
-  if(len(trackers)==0):
-    return np.empty((0,2),dtype=int), np.arange(len(detections)), np.empty((0,5),dtype=int)
+  return association_kernels.associate(detections, trackers, iou_threshold, linear_assignment)
 
-  iou_matrix = iou_batch(detections, trackers)
 
-  if min(iou_matrix.shape) > 0:
-    a = (iou_matrix > iou_threshold).astype(np.int32)
-    if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-        matched_indices = np.stack(np.where(a), axis=1)
-    else:
-      matched_indices = linear_assignment(-iou_matrix)
-  else:
-    matched_indices = np.empty(shape=(0,2))
-
-  unmatched_detections = []
-  for d, det in enumerate(detections):
-    if(d not in matched_indices[:,0]):
-      unmatched_detections.append(d)
-  unmatched_trackers = []
-  for t, trk in enumerate(trackers):
-    if(t not in matched_indices[:,1]):
-      unmatched_trackers.append(t)
-
-  #filter out matched with low IOU
-  matches = []
-  for m in matched_indices:
-    if(iou_matrix[m[0], m[1]]<iou_threshold):
-      unmatched_detections.append(m[0])
-      unmatched_trackers.append(m[1])
-    else:
-      matches.append(m.reshape(1,2))
-  if(len(matches)==0):
-    matches = np.empty((0,2),dtype=int)
-  else:
-    matches = np.concatenate(matches,axis=0)
+def associate_detections_to_trackers_by_class(detections,trackers,det_classes,trk_classes,iou_threshold = 0.3):
+  """
+  Class-partitioned association: IOU matrices are only built between detections and trackers
+  of the same class, so the cost grows with the per-class box counts instead of the total.
 
-  return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
+  Returns 3 arrays of matches, unmatched_detections and unmatched_trackers (indices into the full inputs)
+  """
+  matches, unmatched_detections, unmatched_trackers = [], [], []
+  for c in np.unique(np.concatenate((det_classes, trk_classes))):
+    d_idx = np.flatnonzero(det_classes == c)
+    t_idx = np.flatnonzero(trk_classes == c)
+    m, u_d, u_t = associate_detections_to_trackers(detections[d_idx], trackers[t_idx], iou_threshold)
+    matches.append(np.stack((d_idx[m[:,0]], t_idx[m[:,1]]), axis=1))
+    unmatched_detections.append(d_idx[u_d.astype(int).ravel()])
+    unmatched_trackers.append(t_idx[u_t.astype(int).ravel()])
+  if(len(matches)==0):
+    return np.empty((0,2),dtype=int), np.empty(0,dtype=int), np.empty(0,dtype=int)
+  return np.concatenate(matches), np.concatenate(unmatched_detections), np.concatenate(unmatched_trackers)
 
 
 class Sort(object):
   def __init__(self, max_age=1, min_hits=3, iou_threshold=0.3):
     """
     Sets key parameters for SORT
+
+    All mutable state, including ID allocation, lives in the instance: every Sort numbers its
+    tracks 1, 2, 3, ... independently, so many instances (one per stream) can run side by side
+    or concurrently in threads with deterministic IDs.
     """
     self.max_age = max_age
     self.min_hits = min_hits
     self.iou_threshold = iou_threshold
     self.trackers = []
     self.frame_count = 0
+    self.next_id = 0
 
   def update(self, dets=np.empty((0, 5))):
     """
     Params:
       dets - a numpy array of detections in the format [[x1,y1,x2,y2,score],[x1,y1,x2,y2,score],...]
+             or [[x1,y1,x2,y2,score,class_id],...] to associate each class separately
     Requires: this method must be called once for each frame even with empty detections (use np.empty((0, 5)) for frames without detections).
-    Returns the a similar array, where the last column is the object ID.
+    Returns the a similar array, where the last column is the object ID
+    ([x1,y1,x2,y2,id,class_id] rows when class ids were given).
 
     NOTE: The number of objects returned may differ from the number of detections provided.
     """
     self.frame_count += 1
+    with_classes = dets.shape[1] > 5
     # get predicted locations from existing trackers.
     trks = np.zeros((len(self.trackers), 5))
     to_del = []
@@ -229,7 +227,12 @@ class Sort(object):
     trks = np.ma.compress_rows(np.ma.masked_invalid(trks))
     for t in reversed(to_del):
       self.trackers.pop(t)
-    matched, unmatched_dets, unmatched_trks = associate_detections_to_trackers(dets,trks, self.iou_threshold)
+    if(with_classes):
+      trk_classes = np.array([trk.cls for trk in self.trackers], dtype=int)
+      matched, unmatched_dets, unmatched_trks = associate_detections_to_trackers_by_class(
+        dets, trks, dets[:,5].astype(int), trk_classes, self.iou_threshold)
+    else:
+      matched, unmatched_dets, unmatched_trks = associate_detections_to_trackers(dets,trks, self.iou_threshold)
 
     # update matched trackers with assigned detections
     for m in matched:
@@ -237,20 +240,56 @@ class Sort(object):
 
     # create and initialise new trackers for unmatched detections
     for i in unmatched_dets:
-        trk = KalmanBoxTracker(dets[i,:])
+        trk = KalmanBoxTracker(dets[i,:], self.next_id)
+        self.next_id += 1
         self.trackers.append(trk)
     i = len(self.trackers)
     for trk in reversed(self.trackers):
         d = trk.get_state()[0]
         if (trk.time_since_update < 1) and (trk.hit_streak >= self.min_hits or self.frame_count <= self.min_hits):
-          ret.append(np.concatenate((d,[trk.id+1])).reshape(1,-1)) # +1 as MOT benchmark requires positive
+          row = [trk.id+1, trk.cls] if with_classes else [trk.id+1] # +1 as MOT benchmark requires positive
+          ret.append(np.concatenate((d,row)).reshape(1,-1))
         i -= 1
         # remove dead tracklet
         if(trk.time_since_update > self.max_age):
           self.trackers.pop(i)
     if(len(ret)>0):
       return np.concatenate(ret)
-    return np.empty((0,5))
+    return np.empty((0,6 if with_classes else 5))
+
+  def state_dict(self):
+    """
+    Returns the full tracker state as a dict of numpy arrays (Kalman states and covariances,
+    hit counters, box histories and the ID counter), suitable for np.savez.
+    """
+    n = len(self.trackers)
+    history_len = np.array([len(trk.history) for trk in self.trackers], dtype=np.int64)
+    histories = [np.concatenate(trk.history) for trk in self.trackers if len(trk.history) > 0]
+    return {
+      "params": np.array([self.max_age, self.min_hits, self.iou_threshold], dtype=float),
+      "frame_count": np.array(self.frame_count, dtype=np.int64),
+      "next_id": np.array(self.next_id, dtype=np.int64),
+      "x": np.array([trk.kf.x.ravel() for trk in self.trackers], dtype=float).reshape((n, 7)),
+      "P": np.array([trk.kf.P for trk in self.trackers], dtype=float).reshape((n, 7, 7)),
+      "counters": np.array([[trk.id, trk.cls, trk.time_since_update, trk.hits, trk.hit_streak, trk.age]
+                            for trk in self.trackers], dtype=np.int64).reshape((n, 6)),
+      "history_len": history_len,
+      "history": np.concatenate(histories) if histories else np.empty((0, 4)),
+    }
+
+  def load_state_dict(self, state):
+    """
+    Restores a state produced by state_dict; subsequent updates give the same output as the original tracker.
+    """
+    self.max_age, self.min_hits = int(state["params"][0]), int(state["params"][1])
+    self.iou_threshold = float(state["params"][2])
+    self.frame_count = int(state["frame_count"])
+    offsets = np.concatenate(([0], np.cumsum(state["history_len"])))
+    self.trackers = [
+      KalmanBoxTracker.from_snapshot(state["x"][i], state["P"][i], state["counters"][i],
+                                     state["history"][offsets[i]:offsets[i + 1]])
+      for i in range(len(state["x"]))]
+    self.next_id = int(state["next_id"])
 
 def parse_args():
     """Parse input arguments."""
@@ -277,6 +316,12 @@ if __name__ == '__main__':
   total_frames = 0
   colours = np.random.rand(32, 3) #used only for display
   if(display):
+    # display-only dependencies, kept out of module import so the tracker can be used headless
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    from skimage import io
     if not os.path.exists('mot_benchmark'):
       print('\n\tERROR: mot_benchmark link not found!\n\n    Create a symbolic link to the MOT benchmark\n    (https://motchallenge.net/data/2D_MOT_2015/#download). E.g.:\n\n    $ ln -s /path/to/MOT2015_challenge/2DMOT2015 mot_benchmark\n\n')
       exit()
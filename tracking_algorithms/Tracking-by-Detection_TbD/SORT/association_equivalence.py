@@ -0,0 +1,168 @@
+"""
+association_equivalence.py
+--------------------------
+Equivalence check and benchmark for the SORT association kernels.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Compares every available backend of association_kernels.py ("numba" when
+    installed, "numpy") against the original implementation ("reference"):
+
+        - IoU matrices must be bitwise identical (including zero-area boxes),
+        - matches and unmatched detections / trackers must be identical and in
+          the same order, on random, crowded and empty cases,
+        - full `Sort` runs on synthetic streams must give identical tracks.
+
+    Then times `associate_detections_to_trackers` at increasing box counts.
+    Exits with status 1 on any mismatch.
+
+    Usage:
+        python association_equivalence.py --cases 500 --sizes 50 200 1000
+
+Dependencies:
+    pip install numpy filterpy scipy (optional: numba)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- Add Tracking-by-Detection folder for the synthetic stream generator ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+TBD_DIR = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if TBD_DIR not in sys.path:
+    sys.path.append(TBD_DIR)
+
+import association_kernels
+from Alex_Bewley_SORT import Sort, associate_detections_to_trackers, iou_batch
+from synthetic import synthetic_detection_stream
+
+
+def random_boxes(rng, n, width=640, height=360, min_size=5, max_size=80):
+    wh = rng.uniform(min_size, max_size, (n, 2))
+    xy = rng.uniform(0, 1, (n, 2)) * ([width, height] - wh)
+    return np.column_stack((xy, xy + wh, rng.uniform(0.3, 1, n)))
+
+
+def association_case(rng):
+    """Trackers plus detections that partly follow them (jittered), partly appear from nowhere."""
+    num_trks = int(rng.integers(0, 60))
+    trks = random_boxes(rng, num_trks)
+    follow = trks[rng.random(num_trks) < 0.8].copy()
+    follow[:, :4] += rng.normal(0, rng.choice([1.0, 8.0, 25.0]), (len(follow), 1))
+    dets = np.concatenate((follow, random_boxes(rng, int(rng.integers(0, 10)))))
+    return dets[rng.permutation(len(dets))], trks
+
+
+def same_arrays(a, b):
+    return np.array_equal(np.asarray(a).ravel(), np.asarray(b).ravel(), equal_nan=True)
+
+
+def with_backend(name, fn, *args):
+    previous = association_kernels.BACKEND
+    association_kernels.set_backend(name)
+    try:
+        return fn(*args)
+    finally:
+        association_kernels.set_backend(previous)
+
+
+def check_iou(backends, rng, cases):
+    failures = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(cases):
+            dets = random_boxes(rng, int(rng.integers(0, 80)))
+            trks = random_boxes(rng, int(rng.integers(0, 80)))
+            if len(dets) and len(trks):
+                dets[0, 2:4] = dets[0, 0:2]   # zero-area boxes (0 / 0 for identical ones)
+                trks[0, :4] = dets[0, :4]
+            reference = with_backend("reference", iou_batch, dets, trks)
+            for name in backends:
+                failures += not same_arrays(reference, with_backend(name, iou_batch, dets, trks))
+    return failures
+
+
+def check_association(backends, rng, cases, iou_threshold=0.3):
+    failures = 0
+    for _ in range(cases):
+        dets, trks = association_case(rng)
+        reference = with_backend("reference", associate_detections_to_trackers, dets, trks, iou_threshold)
+        for name in backends:
+            result = with_backend(name, associate_detections_to_trackers, dets, trks, iou_threshold)
+            failures += not all(same_arrays(a, b) for a, b in zip(reference, result))
+    return failures
+
+
+def run_sort(num_frames, num_objects, seed):
+    tracker = Sort(max_age=5, min_hits=3, iou_threshold=0.3)
+    return [tracker.update(dets[:, :5])
+            for dets in synthetic_detection_stream(num_frames, num_objects=num_objects, seed=seed)]
+
+
+def check_sort(backends, streams, num_frames, num_objects):
+    failures = 0
+    for seed in range(streams):
+        reference = with_backend("reference", run_sort, num_frames, num_objects, seed)
+        for name in backends:
+            outputs = with_backend(name, run_sort, num_frames, num_objects, seed)
+            failures += not (len(outputs) == len(reference)
+                             and all(np.array_equal(a, b) for a, b in zip(reference, outputs)))
+    return failures
+
+
+def benchmark(backends, sizes, repeats, seed=0):
+    """Mean ms per association call with `n` detections following `n` trackers."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for n in sizes:
+        trks = random_boxes(rng, n, width=4000, height=4000)
+        dets = trks.copy()
+        dets[:, :4] += rng.normal(0, 3, (n, 1))
+        timings = {}
+        for name in backends:
+            with_backend(name, associate_detections_to_trackers, dets, trks)   # warm-up / JIT compile
+            start = time.perf_counter()
+            for _ in range(repeats):
+                with_backend(name, associate_detections_to_trackers, dets, trks)
+            timings[name] = 1000 * (time.perf_counter() - start) / repeats
+        rows.append((n, timings))
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Equivalence check and benchmark for SORT association kernels")
+    parser.add_argument("--cases", type=int, default=500, help="Random IoU / association cases [500]")
+    parser.add_argument("--streams", type=int, default=5, help="Synthetic streams for full Sort runs [5]")
+    parser.add_argument("--frames", type=int, default=300, help="Frames per stream [300]")
+    parser.add_argument("--objects", type=int, default=40, help="Objects per stream [40]")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000], help="Box counts to time")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed calls per size [20]")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    backends = [name for name in association_kernels.available_backends() if name != "reference"]
+    print(f"Association backends: {', '.join(backends)} (default: {association_kernels.BACKEND})")
+
+    rng = np.random.default_rng(0)
+    failures = {
+        "IoU matrices": check_iou(backends, rng, args.cases),
+        "associations": check_association(backends, rng, args.cases),
+        "Sort outputs": check_sort(backends, args.streams, args.frames, args.objects),
+    }
+    for title, count in failures.items():
+        print(f"  - {title:<13}: {'OK' if count == 0 else f'{count} MISMATCH(ES)'}")
+
+    print("\nms per association call (detections = trackers = n):")
+    for n, timings in benchmark(["reference"] + backends, args.sizes, args.repeats):
+        reference = timings["reference"]
+        print(f"  - n={n:<5}: " + "  ".join(f"{name} {ms:8.3f} ({reference / ms:5.1f}x)"
+                                             for name, ms in timings.items()))
+
+    sys.exit(1 if any(failures.values()) else 0)
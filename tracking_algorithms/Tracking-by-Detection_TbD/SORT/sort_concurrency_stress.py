@@ -0,0 +1,90 @@
+"""
+sort_concurrency_stress.py
+--------------------------
+Concurrency stress test for Alex Bewley's SORT with per-instance ID allocation.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Runs many independent `Sort` instances (one per synthetic stream) first
+    sequentially, then several times concurrently in a thread pool with a tiny
+    GIL switch interval to force interleaving. Every concurrent run must give
+    exactly the same per-stream output as the sequential reference, and every
+    stream must number its tracks from 1. Exits with status 1 on any mismatch.
+
+    Usage:
+        python sort_concurrency_stress.py --streams 32 --frames 500 --workers 16 --rounds 3
+
+Dependencies:
+    pip install numpy filterpy scipy
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# --- Add Tracking-by-Detection folder for the synthetic stream generator ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+TBD_DIR = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if TBD_DIR not in sys.path:
+    sys.path.append(TBD_DIR)
+
+from Alex_Bewley_SORT import Sort
+from synthetic import synthetic_detection_stream
+
+
+def run_stream(seed, num_frames, num_objects):
+    """Track one synthetic stream with its own Sort instance; returns the per-frame outputs."""
+    tracker = Sort(max_age=5, min_hits=3, iou_threshold=0.3)
+    return [tracker.update(dets[:, :5])
+            for dets in synthetic_detection_stream(num_frames, num_objects=num_objects, seed=seed)]
+
+
+def same_outputs(a, b):
+    return len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrency stress test for per-instance SORT IDs")
+    parser.add_argument("--streams", type=int, default=32, help="Independent Sort instances [32]")
+    parser.add_argument("--frames", type=int, default=500, help="Frames per stream [500]")
+    parser.add_argument("--objects", type=int, default=20, help="Objects per stream [20]")
+    parser.add_argument("--workers", type=int, default=16, help="Thread pool size [16]")
+    parser.add_argument("--rounds", type=int, default=3, help="Concurrent repetitions [3]")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    seeds = list(range(args.streams))
+
+    start = time.time()
+    reference = [run_stream(seed, args.frames, args.objects) for seed in seeds]
+    print(f"Sequential reference: {args.streams} streams x {args.frames} frames in {time.time() - start:.2f} sec")
+
+    failures = 0
+    for seed, outputs in zip(seeds, reference):
+        ids = np.concatenate([o[:, 4] for o in outputs if len(o)])
+        if ids.min() != 1:
+            print(f"  - stream {seed}: IDs start at {int(ids.min())}, expected 1")
+            failures += 1
+
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible to provoke races
+    for round_idx in range(args.rounds):
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(run_stream, seeds, [args.frames] * args.streams, [args.objects] * args.streams))
+        mismatched = [seed for seed, a, b in zip(seeds, reference, results) if not same_outputs(a, b)]
+        failures += len(mismatched)
+        print(f"Concurrent round {round_idx + 1}: {time.time() - start:.2f} sec, "
+              f"{len(mismatched)} mismatched stream(s) {mismatched if mismatched else ''}")
+
+    if failures:
+        print("\nFAILED: concurrent SORT output differs from the sequential reference")
+        sys.exit(1)
+    print("\nOK: every concurrent stream reproduced its sequential output with IDs starting at 1")
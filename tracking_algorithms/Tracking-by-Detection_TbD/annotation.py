@@ -0,0 +1,203 @@
+"""
+annotation.py
+-------------
+Batched track drawing with cached label sprites.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Drawing every track with its own `cv2.rectangle` + `cv2.putText` call (and a
+    new f-string per box per frame) becomes one of the most expensive per-frame
+    steps at a few hundred boxes. `AnnotationCompositor` instead:
+
+        - renders each `<Label> | ID:<id>` caption once and caches the glyph
+          sprite (pixels + mask) per track, then copies it into the caption's
+          own region with one masked `cv2.copyTo`,
+        - draws all rectangles with a single batched `cv2.polylines` call,
+        - never touches pixels outside the boxes and captions: no full-frame
+          overlay is built, resized or masked,
+        - can lay the overlay out only every Nth frame (`every`), re-applying
+          the cached boxes and caption placements in between.
+
+    `draw_tracks` is the original per-box path, kept for comparison.
+
+    Usage (benchmark against the per-box path):
+        python annotation.py --boxes 250 --frames 200
+
+Dependencies:
+    pip install opencv-python numpy
+"""
+
+import argparse
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def draw_tracks(frame, tracks, label="Person", color=(255, 0, 0), font_scale=0.35, class_names=None):
+    """Draw track boxes and `<label> | ID:<id>` captions in place (per-class labels when `class_names` is given)."""
+    for track in tracks:
+        x1, y1, x2, y2, track_id = track[:5]
+        name = label
+        if class_names and len(track) > 5:
+            name = class_names.get(int(track[5]), label).capitalize()
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 1)
+        cv2.putText(frame, f" {name} | ID:{int(track_id)}", (int(x1), max(20, int(y1) - 10)),
+                    FONT, font_scale, (255, 255, 255), 1)
+
+
+class AnnotationCompositor:
+    def __init__(self, label="Person", color=(255, 0, 0), font_scale=0.35, class_names=None,
+                 text_color=(255, 255, 255), every=1, max_sprites=4096):
+        """
+        every       : lay out boxes and captions every `every` frames and re-apply the cached layout in between
+        max_sprites : label sprites kept in the LRU cache
+        """
+        self.label = label
+        self.color = color
+        self.font_scale = font_scale
+        self.class_names = class_names
+        self.text_color = text_color
+        self.every = max(1, int(every))
+        self.max_sprites = max_sprites
+
+        self._sprites = OrderedDict()
+        self._layout = None   # (box polygons, [(sprite, x, y), ...]) at frame resolution
+        self._frames_since_layout = 0
+
+    # --- Label sprites ---
+
+    def _sprite(self, class_id, track_id):
+        key = (class_id, track_id)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+
+        name = self.label
+        if self.class_names and class_id >= 0:
+            name = self.class_names.get(class_id, self.label).capitalize()
+        text = f" {name} | ID:{track_id}"
+        (w, h), baseline = cv2.getTextSize(text, FONT, self.font_scale, 1)
+        mask = np.zeros((h + baseline, w), dtype=np.uint8)
+        cv2.putText(mask, text, (0, h), FONT, self.font_scale, 255, 1)
+        pixels = np.zeros(mask.shape + (3,), dtype=np.uint8)
+        pixels[mask > 0] = self.text_color
+        sprite = (pixels, mask, h)
+
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    @staticmethod
+    def _blit(image, pixels, mask, x, y):
+        """Copy the masked sprite into `image` with its top-left corner at (x, y), clipped to the image."""
+        H, W = image.shape[:2]
+        h, w = mask.shape
+        if x >= 0 and y >= 0 and x + w <= W and y + h <= H:
+            cv2.copyTo(pixels, mask, image[y:y + h, x:x + w])   # writes into the region view in place
+            return
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, W), min(y + h, H)
+        if x0 >= x1 or y0 >= y1:
+            return
+        sub = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        cv2.copyTo(pixels[sub], mask[sub], image[y0:y1, x0:x1])
+
+    # --- Rendering ---
+
+    def _lay_out(self, tracks):
+        """Box polygons for one polylines call and (sprite, x, y) caption placements."""
+        if len(tracks) == 0:
+            return [], []
+        boxes = np.round(tracks[:, :4]).astype(np.int32)
+        x1, y1, x2, y2 = boxes.T
+        corners = np.stack((np.column_stack((x1, y1)), np.column_stack((x2, y1)),
+                            np.column_stack((x2, y2)), np.column_stack((x1, y2))), axis=1)
+        polygons = list(corners.reshape(-1, 4, 1, 2))
+
+        track_ids = tracks[:, 4].astype(int)
+        class_ids = tracks[:, 5].astype(int) if tracks.shape[1] > 5 else np.full(len(tracks), -1)
+        origins_y = np.maximum(20, y1 - 10)
+        placements = []
+        for x, y, track_id, class_id in zip(x1.tolist(), origins_y.tolist(),
+                                            track_ids.tolist(), class_ids.tolist()):
+            sprite = self._sprite(class_id, track_id)
+            placements.append((sprite, x, y - sprite[2]))
+        return polygons, placements
+
+    def draw(self, frame, tracks):
+        """Annotate `frame` in place with the (M, 5/6) track array."""
+        if self._layout is None or self._frames_since_layout >= self.every - 1:
+            self._layout = self._lay_out(np.asarray(tracks, dtype=float))
+            self._frames_since_layout = 0
+        else:
+            self._frames_since_layout += 1
+
+        polygons, placements = self._layout
+        if polygons:
+            cv2.polylines(frame, polygons, True, self.color, 1)
+        for (pixels, mask, _), x, y in placements:
+            self._blit(frame, pixels, mask, x, y)
+        return frame
+
+
+# --- Benchmark ---
+
+def _synthetic_tracks(num_boxes, width, height, rng):
+    wh = rng.uniform([15, 30], [50, 100], (num_boxes, 2))
+    xy = rng.uniform(0, 1, (num_boxes, 2)) * ([width, height] - wh)
+    return np.column_stack((xy, xy + wh, np.arange(1, num_boxes + 1), np.zeros(num_boxes)))
+
+
+def benchmark_annotation(num_boxes=250, num_frames=200, width=1280, height=720, seed=0):
+    """Per-frame annotation cost (ms) of the per-box path vs. the compositor in several modes."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    jitter = [rng.normal(0, 1.5, (num_boxes, 2)) for _ in range(num_frames)]
+    tracks = _synthetic_tracks(num_boxes, width, height, rng)
+    class_names = {0: "person"}
+
+    def frames():
+        for offset in jitter:
+            moved = tracks.copy()
+            moved[:, 0:2] += offset
+            moved[:, 2:4] += offset
+            yield base.copy(), moved
+
+    def timed(draw):
+        elapsed = 0.0
+        for frame, frame_tracks in frames():
+            start = time.perf_counter()
+            draw(frame, frame_tracks)
+            elapsed += time.perf_counter() - start
+        return 1000 * elapsed / num_frames
+
+    results = {"per-box (cv2.rectangle + putText)":
+               timed(lambda f, t: draw_tracks(f, t, class_names=class_names))}
+    for title, options in (("compositor", {}),
+                           ("compositor, every=3", {"every": 3})):
+        compositor = AnnotationCompositor(class_names=class_names, **options)
+        results[title] = timed(compositor.draw)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Annotation cost: per-box drawing vs. AnnotationCompositor")
+    parser.add_argument("--boxes", type=int, default=250, help="Tracks per frame [250]")
+    parser.add_argument("--frames", type=int, default=200, help="Frames to annotate [200]")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    results = benchmark_annotation(args.boxes, args.frames, args.width, args.height)
+    reference = next(iter(results.values()))
+    print(f"Annotation cost per frame ({args.boxes} boxes, {args.width}x{args.height}, {args.frames} frames):")
+    for title, ms in results.items():
+        print(f"  - {title:<34}: {ms:7.3f} ms  ({reference / ms:5.2f}x)")
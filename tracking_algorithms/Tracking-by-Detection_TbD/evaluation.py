@@ -0,0 +1,329 @@
+"""
+evaluation.py
+-------------
+Offline MOT evaluation (MOTA, IDF1, HOTA) and a combined speed / accuracy report for all trackers.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    "Unique Persons Tracked" is not an accuracy metric, so this module scores
+    tracker output against MOTChallenge ground truth:
+
+        - CLEAR MOT : MOTA, MOTP, false positives / negatives and ID switches
+                      (IoU >= 0.5, matches from the previous frame kept first),
+        - IDF1      : global ID-to-ID assignment on the number of frames each
+                      (ground-truth ID, tracker ID) pair overlaps,
+        - HOTA      : detection / association accuracy averaged over
+                      localization thresholds 0.05 ... 0.95 (as in TrackEval).
+
+    Each frame is matched with one vectorized IoU matrix and a Hungarian solve.
+    Per-ID statistics are accumulated with `np.add.at` on dense ID-pair arrays.
+    `evaluate` also returns the raw counts. `combine` sums them over sequences
+    and recomputes every metric from the sums, as TrackEval does, instead of
+    averaging per-sequence scores.
+    Only ground-truth rows with a non-zero flag and class -1 / 1 (pedestrian)
+    are scored. Distractor regions are not removed, so numbers can differ
+    slightly from the official MOT scripts, but they are stable across runs.
+    That makes them suitable for checking optimizations for regressions.
+
+    Layout (same as Alex_Bewley_SORT.py): <data>/<phase>/<sequence>/det/det.txt
+    and gt/gt.txt (optionally seqinfo.ini and img1/ frames, which DeepSORT needs).
+
+    Usage:
+        # score existing result files (e.g. Alex_Bewley_SORT.py writes output/<sequence>.txt)
+        python evaluation.py --data data --phase train --results output
+
+        # run the trackers on det.txt and report speed next to accuracy
+        python evaluation.py --data data --phase train --trackers sort bytetrack --interpolate rts
+
+Dependencies:
+    pip install numpy scipy (plus the tracker backends, see tracker_api.py)
+"""
+
+import argparse
+import configparser
+import glob
+import os
+import time
+
+import numpy as np
+
+from mot_io import load_mot, save_mot
+
+HOTA_ALPHAS = np.arange(0.05, 0.99, 0.05)
+
+
+def iou_matrix(a, b):
+    """(len(a), len(b)) IoU between [x1, y1, x2, y2] rows."""
+    a, b = a[:, None, :], b[None, :, :]
+    w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = w * h
+    union = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1]) + (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1]) \
+        - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _hungarian(score):
+    from scipy.optimize import linear_sum_assignment
+
+    return linear_sum_assignment(-score)
+
+
+def _frames(gt, results):
+    """Per frame: (gt ID indices, gt boxes, tracker ID indices, tracker boxes, IoU matrix); IDs made 0-based."""
+    gt_ids, gt_idx = np.unique(gt[:, 1], return_inverse=True)
+    trk_ids, trk_idx = np.unique(results[:, 1], return_inverse=True)
+    num_frames = int(max(gt[:, 0].max(initial=0), results[:, 0].max(initial=0)))
+    gt_order, trk_order = np.argsort(gt[:, 0], kind="stable"), np.argsort(results[:, 0], kind="stable")
+    gt_bounds = np.searchsorted(gt[gt_order, 0], np.arange(1, num_frames + 2))
+    trk_bounds = np.searchsorted(results[trk_order, 0], np.arange(1, num_frames + 2))
+
+    frames = []
+    for f in range(num_frames):
+        g = gt_order[gt_bounds[f]:gt_bounds[f + 1]]
+        t = trk_order[trk_bounds[f]:trk_bounds[f + 1]]
+        frames.append((gt_idx[g], trk_idx[t], iou_matrix(gt[g, 2:6], results[t, 2:6])))
+    return frames, len(gt_ids), len(trk_ids)
+
+
+def clear_mot(frames, num_gt_ids, threshold=0.5):
+    """
+    CLEAR MOT counts. Correspondences from the previous frame are kept while IoU >= threshold; a gt ID whose
+    matched tracker ID differs from the last one it was ever matched to is an ID switch.
+    """
+    prev_timestep = np.full(num_gt_ids, -1)     # tracker ID matched to each gt ID in the previous frame
+    prev_ever = np.full(num_gt_ids, -1)         # last tracker ID ever matched to each gt ID
+    tp = fp = fn = idsw = 0
+    overlap = 0.0
+    for g, t, iou in frames:
+        if len(g) and len(t):
+            score = np.where(iou >= threshold, iou, 0.)
+            # continuing matches win: give them a bonus larger than any IoU
+            score += 1000 * ((prev_timestep[g][:, None] == t[None, :]) & (score > 0))
+            rows, cols = _hungarian(score)
+            valid = score[rows, cols] > 0
+            rows, cols = rows[valid], cols[valid]
+        else:
+            rows = cols = np.empty(0, dtype=int)
+        matched_gt, matched_trk = g[rows], t[cols]
+        idsw += np.count_nonzero((prev_ever[matched_gt] >= 0) & (prev_ever[matched_gt] != matched_trk))
+        prev_ever[matched_gt] = matched_trk
+        prev_timestep[:] = -1
+        prev_timestep[matched_gt] = matched_trk
+        tp += len(rows)
+        fn += len(g) - len(rows)
+        fp += len(t) - len(rows)
+        overlap += iou[rows, cols].sum()
+    return {"TP": int(tp), "FP": int(fp), "FN": int(fn), "IDSW": int(idsw), "MOTP_sum": float(overlap)}
+
+
+def identity_metrics(frames, num_gt_ids, num_trk_ids, threshold=0.5):
+    """IDTP from the best one-to-one mapping between ground-truth and tracker IDs, plus gt / tracker box counts."""
+    overlaps = np.zeros((num_gt_ids, num_trk_ids))
+    gt_count, trk_count = np.zeros(num_gt_ids), np.zeros(num_trk_ids)
+    for g, t, iou in frames:
+        np.add.at(gt_count, g, 1)
+        np.add.at(trk_count, t, 1)
+        rows, cols = np.nonzero(iou >= threshold)
+        np.add.at(overlaps, (g[rows], t[cols]), 1)
+    idtp = overlaps[_hungarian(overlaps)].sum() if overlaps.size else 0.
+    return {"IDTP": int(idtp), "GT_DETS": int(gt_count.sum()), "TRK_DETS": int(trk_count.sum())}
+
+
+def hota(frames, num_gt_ids, num_trk_ids):
+    """Per-alpha HOTA counts over HOTA_ALPHAS: TP / FN / FP, summed localization and TP-weighted association."""
+    # global alignment score between every gt ID and tracker ID
+    potential = np.zeros((num_gt_ids, num_trk_ids))
+    gt_count, trk_count = np.zeros(num_gt_ids), np.zeros(num_trk_ids)
+    for g, t, iou in frames:
+        denom = iou.sum(0)[None, :] + iou.sum(1)[:, None] - iou
+        potential[g[:, None], t[None, :]] += np.divide(iou, denom, out=np.zeros_like(iou), where=denom > 1e-10)
+        np.add.at(gt_count, g, 1)
+        np.add.at(trk_count, t, 1)
+    alignment = potential / (gt_count[:, None] + trk_count[None, :] - potential)
+
+    A = len(HOTA_ALPHAS)
+    tp, fn, fp, loc = np.zeros(A), np.zeros(A), np.zeros(A), np.zeros(A)
+    matches = np.zeros((A, num_gt_ids, num_trk_ids))
+    for g, t, iou in frames:
+        if len(g) == 0 or len(t) == 0:
+            fn += len(g)
+            fp += len(t)
+            continue
+        rows, cols = _hungarian(alignment[g[:, None], t[None, :]] * iou)
+        sim = iou[rows, cols]
+        ok = sim[None, :] >= HOTA_ALPHAS[:, None] - 1e-10       # (A, matches)
+        n = ok.sum(1)
+        tp += n
+        fn += len(g) - n
+        fp += len(t) - n
+        loc += (ok * sim[None, :]).sum(1)
+        a, m = np.nonzero(ok)
+        np.add.at(matches, (a, g[rows[m]], t[cols[m]]), 1)
+
+    ass_iou = np.divide(matches, gt_count[None, :, None] + trk_count[None, None, :] - matches,
+                        out=np.zeros_like(matches), where=matches > 0)
+    return {"HOTA_TP": tp, "HOTA_FN": fn, "HOTA_FP": fp, "HOTA_LOC_sum": loc,
+            "HOTA_ASS_sum": (matches * ass_iou).sum((1, 2))}
+
+
+COUNT_KEYS = ("TP", "FP", "FN", "IDSW", "MOTP_sum", "IDTP", "GT_DETS", "TRK_DETS",
+              "HOTA_TP", "HOTA_FN", "HOTA_FP", "HOTA_LOC_sum", "HOTA_ASS_sum")
+
+
+def metrics_from_counts(counts):
+    """MOTA / MOTP, IDF1 / IDP / IDR and HOTA / DetA / AssA / LocA (means over HOTA_ALPHAS) from raw counts."""
+    tp, fn, fp = counts["HOTA_TP"], counts["HOTA_FN"], counts["HOTA_FP"]
+    ass_a = np.divide(counts["HOTA_ASS_sum"], tp, out=np.zeros(len(tp)), where=tp > 0)
+    det_a = np.divide(tp, tp + fn + fp, out=np.zeros(len(tp)), where=(tp + fn + fp) > 0)
+    loc_a = np.divide(counts["HOTA_LOC_sum"], tp, out=np.zeros(len(tp)), where=tp > 0)
+    num_gt, num_trk, idtp = counts["GT_DETS"], counts["TRK_DETS"], counts["IDTP"]
+    return {"MOTA": float(1 - (counts["FN"] + counts["FP"] + counts["IDSW"]) / max(counts["TP"] + counts["FN"], 1)),
+            "MOTP": float(counts["MOTP_sum"] / max(counts["TP"], 1)),
+            "IDF1": float(2 * idtp / max(num_gt + num_trk, 1)), "IDP": float(idtp / max(num_trk, 1)),
+            "IDR": float(idtp / max(num_gt, 1)),
+            "HOTA": float(np.sqrt(det_a * ass_a).mean()), "DetA": float(det_a.mean()),
+            "AssA": float(ass_a.mean()), "LocA": float(loc_a.mean())}
+
+
+def load_ground_truth(path):
+    """Scored ground-truth rows: flag != 0 and class -1 (MOT15) or 1 (pedestrian, MOT16/17)."""
+    gt = load_mot(path)
+    return gt[(gt[:, 6] != 0) & np.isin(gt[:, 7], (-1, 1))]
+
+
+def evaluate(gt, results):
+    """
+    All metrics for one sequence, plus the raw counts (COUNT_KEYS) they are computed from;
+    `gt` / `results` are MOT file paths or load_mot arrays.
+    """
+    gt = load_ground_truth(gt) if isinstance(gt, str) else gt
+    results = load_mot(results) if isinstance(results, str) else results
+    frames, num_gt_ids, num_trk_ids = _frames(gt, results)
+    counts = clear_mot(frames, num_gt_ids)
+    counts.update(identity_metrics(frames, num_gt_ids, num_trk_ids))
+    counts.update(hota(frames, num_gt_ids, num_trk_ids))
+    return {**metrics_from_counts(counts), **counts}
+
+
+def combine(per_sequence):
+    """Metrics over several sequences, recomputed from the summed counts (as TrackEval combines sequences)."""
+    counts = {k: sum(m[k] for m in per_sequence) for k in COUNT_KEYS}
+    return {**metrics_from_counts(counts), **counts}
+
+
+# --- Sequences and trackers ---
+
+def find_sequences(data, phase="train"):
+    """{sequence name: directory} for every <data>/<phase>/<seq> with gt/gt.txt."""
+    pattern = os.path.join(data, phase, "*", "gt", "gt.txt")
+    return {os.path.basename(os.path.dirname(os.path.dirname(p))): os.path.dirname(os.path.dirname(p))
+            for p in sorted(glob.glob(pattern))}
+
+
+def sequence_length(seq_dir, *arrays):
+    ini = os.path.join(seq_dir, "seqinfo.ini")
+    if os.path.exists(ini):
+        config = configparser.ConfigParser()
+        config.read(ini)
+        if config.has_option("Sequence", "seqLength"):
+            return config.getint("Sequence", "seqLength")
+    return int(max(a[:, 0].max(initial=0) for a in arrays))
+
+
+def run_tracker(tracker_name, seq_dir, output, tracker_kwargs=None):
+    """Track det/det.txt of one sequence; writes MOT results to `output` and returns (frames, tracker seconds)."""
+    from tracker_api import build_tracker
+
+    tracker = build_tracker(tracker_name, **(tracker_kwargs or {}))
+    dets = load_mot(os.path.join(seq_dir, "det", "det.txt"))
+    num_frames = sequence_length(seq_dir, dets)
+    order = np.argsort(dets[:, 0], kind="stable")
+    bounds = np.searchsorted(dets[order, 0], np.arange(1, num_frames + 2))
+    needs_frames = tracker_name.lower() == "deepsort"
+    if needs_frames:
+        import cv2
+
+    rows, elapsed = [], 0.0
+    for f in range(num_frames):
+        frame_dets = dets[order[bounds[f]:bounds[f + 1]]]
+        frame = cv2.imread(os.path.join(seq_dir, "img1", "%06d.jpg" % (f + 1))) if needs_frames else None
+        start = time.perf_counter()
+        tracks = tracker.update(frame_dets[:, [2, 3, 4, 5, 6]], frame)
+        elapsed += time.perf_counter() - start
+        if len(tracks):
+            rows.append(np.column_stack((np.full(len(tracks), f + 1), tracks[:, 4], tracks[:, :4], tracks[:, 5])))
+    save_mot(output, np.concatenate(rows) if rows else np.empty((0, 7)))
+    return num_frames, elapsed
+
+
+def benchmark(data, phase="train", trackers=("sort", "bytetrack"), output_dir="eval_output", interpolate=None):
+    """Run every tracker on every sequence; returns rows of (name, tracker FPS, metrics over all sequences)."""
+    from interpolation import interpolate_mot_file
+
+    sequences = find_sequences(data, phase)
+    if not sequences:
+        raise FileNotFoundError(f"No sequences with gt/gt.txt under {os.path.join(data, phase)}")
+    report = []
+    for name in trackers:
+        os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+        metrics, post, frames, seconds, post_seconds = [], [], 0, 0.0, 0.0
+        for seq, seq_dir in sequences.items():
+            output = os.path.join(output_dir, name, f"{seq}.txt")
+            n, elapsed = run_tracker(name, seq_dir, output)
+            frames, seconds = frames + n, seconds + elapsed
+            gt = load_ground_truth(os.path.join(seq_dir, "gt", "gt.txt"))
+            metrics.append(evaluate(gt, output))
+            if interpolate:
+                summary = interpolate_mot_file(output, mode=interpolate)
+                post_seconds += summary["seconds"]
+                post.append(evaluate(gt, summary["output"]))
+        report.append((name, frames / max(seconds, 1e-9), combine(metrics)))
+        if interpolate:
+            report.append((f"{name} + {interpolate}", frames / max(seconds + post_seconds, 1e-9),
+                           combine(post)))
+    return report
+
+
+def evaluate_results(data, results_dir, phase="train"):
+    """Score existing <results_dir>/<sequence>.txt files; returns one report row."""
+    sequences = find_sequences(data, phase)
+    metrics = []
+    for seq, seq_dir in sequences.items():
+        path = os.path.join(results_dir, f"{seq}.txt")
+        if not os.path.exists(path):
+            print(f"  - missing results for {seq}, skipped")
+            continue
+        gt = load_ground_truth(os.path.join(seq_dir, "gt", "gt.txt"))
+        metrics.append(evaluate(gt, path))
+    if not metrics:
+        raise FileNotFoundError(f"No result files for the sequences under {os.path.join(data, phase)}")
+    return [(os.path.basename(os.path.normpath(results_dir)), None, combine(metrics))]
+
+
+def print_report(report):
+    print(f"{'Tracker':<22} {'FPS':>9} {'MOTA':>7} {'IDF1':>7} {'HOTA':>7} {'DetA':>7} {'AssA':>7} "
+          f"{'IDSW':>6} {'FP':>7} {'FN':>7}")
+    for name, fps, m in report:
+        fps = f"{fps:9.1f}" if fps is not None else f"{'-':>9}"
+        print(f"{name:<22} {fps} {100 * m['MOTA']:7.2f} {100 * m['IDF1']:7.2f} {100 * m['HOTA']:7.2f} "
+              f"{100 * m['DetA']:7.2f} {100 * m['AssA']:7.2f} {m['IDSW']:6d} {m['FP']:7d} {m['FN']:7d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MOTA / IDF1 / HOTA evaluation with tracker speed")
+    parser.add_argument("--data", default="data", help="MOT data root (as for Alex_Bewley_SORT.py) [data]")
+    parser.add_argument("--phase", default="train", help="Subdirectory of --data [train]")
+    parser.add_argument("--results", default=None, help="Only score existing <results>/<sequence>.txt files")
+    parser.add_argument("--trackers", nargs="+", default=["sort", "bytetrack"], help="Trackers to run")
+    parser.add_argument("--interpolate", choices=("linear", "rts"), default=None,
+                        help="Also score each tracker after the interpolation.py post-pass")
+    parser.add_argument("--output", default="eval_output", help="Where tracker results are written [eval_output]")
+    args = parser.parse_args()
+
+    if args.results:
+        print_report(evaluate_results(args.data, args.results, args.phase))
+    else:
+        print_report(benchmark(args.data, args.phase, args.trackers, args.output, args.interpolate))
@@ -0,0 +1,314 @@
+"""
+interpolation.py
+----------------
+Offline post-pass over MOT track output: tracklet linking across gaps plus gap filling / smoothing.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    SORT only reports a track on frames where it was matched, and a track that
+    is lost for longer than max_age comes back with a new ID. For offline jobs,
+    this post-pass works on the whole track table ((N, 7) rows of
+    [frame, id, x1, y1, x2, y2, class_id], see mot_io.py; class -1 where
+    unknown) at once:
+
+        1. Linking: every tracklet end is extrapolated at constant velocity to
+           the start frame of each tracklet starting at most `max_gap` frames
+           later. Candidate pairs come from a sorted-frame window search, must
+           share the class id, and are scored by IoU with the extrapolated box. They are then assigned
+           globally with the Hungarian algorithm, one small problem per
+           connected group of candidates. Linked tracklets take the ID of the
+           first one in their chain.
+        2. Filling: missing frames (gaps up to `max_gap`) are filled either
+           - "linear": linear interpolation between the surrounding boxes
+             (observed boxes unchanged), or
+           - "rts": a constant-velocity Kalman filter with a Rauch-Tung-Striebel
+             backward pass over [cx, cy, w, h], which also smooths observed
+             boxes. Track segments are filtered together in a few length-sorted
+             batches, with one step per frame offset.
+
+    Everything except the per-frame Kalman recursion is vectorized over rows.
+
+    Usage:
+        python interpolation.py output/sort.txt -o output/sort_rts.txt --mode rts --max-gap 30
+        python track.py --tracker sort --mot-output sort.txt --interpolate rts
+
+Dependencies:
+    pip install numpy scipy
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from mot_io import load_mot, save_mot
+
+
+def _sort_rows(rows):
+    return rows[np.lexsort((rows[:, 0], rows[:, 1]))]
+
+
+def _as_rows(rows):
+    """Float (N, 7) [frame, id, x1, y1, x2, y2, class_id] rows; class -1 when only 6 columns are given."""
+    rows = np.asarray(rows, dtype=float).reshape(-1, np.shape(rows)[-1] if np.size(rows) else 7)
+    if rows.shape[1] < 7:
+        rows = np.column_stack((rows[:, :6], np.full(len(rows), -1.0)))
+    return rows[:, :7]
+
+
+def _check_max_gap(max_gap):
+    if max_gap < 1:
+        raise ValueError(f"max_gap must be at least 1 frame (got {max_gap})")
+
+
+def gap_frames(value):
+    """argparse type for --max-gap: a positive number of frames."""
+    gap = int(value)
+    if gap < 1:
+        raise argparse.ArgumentTypeError(f"max gap must be at least 1 frame, got {value}")
+    return gap
+
+
+def _box_iou(a, b):
+    """Row-wise IoU of two (P, 4) box arrays."""
+    w = np.clip(np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]), 0, None)
+    h = np.clip(np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]), 0, None)
+    inter = w * h
+    union = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1]) + (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1]) - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+# --- 1. Tracklet linking ---
+
+def _tracklets(rows, velocity_window=5):
+    """Per-ID first / last frame and box, class, and the end velocity over the last `velocity_window` rows."""
+    ids, first, counts = np.unique(rows[:, 1], return_index=True, return_counts=True)
+    last = first + counts - 1
+    ref = np.maximum(first, last - velocity_window)
+    dt = rows[last, 0] - rows[ref, 0]
+    velocity = np.divide(rows[last, 2:6] - rows[ref, 2:6], dt[:, None], out=np.zeros((len(ids), 4)),
+                         where=dt[:, None] > 0)
+    return ids, rows[first, 0], rows[first, 2:6], rows[last, 0], rows[last, 2:6], velocity, rows[first, 6]
+
+
+def _candidate_pairs(start_frames, end_frames, max_gap):
+    """(end, start) tracklet index pairs with 1 <= start_frame - end_frame <= max_gap (ragged window search)."""
+    order = np.argsort(start_frames, kind="stable")
+    sorted_starts = start_frames[order]
+    lo = np.searchsorted(sorted_starts, end_frames + 1, side="left")
+    hi = np.searchsorted(sorted_starts, end_frames + max_gap, side="right")
+    counts = hi - lo
+    ends = np.repeat(np.arange(len(end_frames)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return ends, order[np.repeat(lo, counts) + offsets]
+
+
+def _assign(ends, starts, cost):
+    """Minimum-cost one-to-one links, solved separately for each connected group of candidate pairs."""
+    from scipy.optimize import linear_sum_assignment
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    if len(ends) == 0:
+        return ends, starts
+    n = int(max(ends.max(), starts.max())) + 1
+    graph = coo_matrix((np.ones(len(ends)), (ends, n + starts)), shape=(2 * n, 2 * n))
+    _, labels = connected_components(graph, directed=False)
+
+    order = np.argsort(labels[ends], kind="stable")
+    groups = np.split(order, np.flatnonzero(np.diff(labels[ends][order])) + 1)
+    linked_ends, linked_starts = [], []
+    for group in groups:
+        rows, row_idx = np.unique(ends[group], return_inverse=True)
+        cols, col_idx = np.unique(starts[group], return_inverse=True)
+        matrix = np.full((len(rows), len(cols)), np.inf)
+        matrix[row_idx, col_idx] = cost[group]
+        r, c = linear_sum_assignment(np.where(np.isinf(matrix), 1e9, matrix))
+        valid = np.isfinite(matrix[r, c])
+        linked_ends.append(rows[r[valid]])
+        linked_starts.append(cols[c[valid]])
+    return np.concatenate(linked_ends), np.concatenate(linked_starts)
+
+
+def link_tracklets(rows, max_gap=30, min_iou=0.1, gap_weight=0.1):
+    """
+    Merge same-class tracklets separated by at most `max_gap` frames whose extrapolated end overlaps the
+    next start. Returns (rows with merged IDs, number of links).
+    """
+    _check_max_gap(max_gap)
+    rows = _sort_rows(_as_rows(rows))
+    if len(rows) == 0:
+        return rows, 0
+    ids, start_frames, start_boxes, end_frames, end_boxes, velocity, classes = _tracklets(rows)
+
+    ends, starts = _candidate_pairs(start_frames, end_frames, max_gap)
+    same_class = classes[ends] == classes[starts]
+    ends, starts = ends[same_class], starts[same_class]
+    gap = start_frames[starts] - end_frames[ends]
+    iou = _box_iou(end_boxes[ends] + velocity[ends] * gap[:, None], start_boxes[starts])
+    keep = iou >= min_iou
+    ends, starts = ends[keep], starts[keep]
+    cost = (1 - iou[keep]) + gap_weight * gap[keep] / max_gap     # prefer overlap, then short gaps
+    linked_ends, linked_starts = _assign(ends, starts, cost)
+
+    # follow chains (a -> b -> c) by pointer jumping; every tracklet gets the ID of its chain's first tracklet
+    parent = np.arange(len(ids))
+    parent[linked_starts] = linked_ends
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            break
+        parent = grandparent
+    merged = rows.copy()
+    merged[:, 1] = ids[parent][np.searchsorted(ids, rows[:, 1])]
+    return _sort_rows(merged), len(linked_ends)
+
+
+# --- 2. Gap filling ---
+
+def fill_linear(rows, max_gap=30):
+    """Add linearly interpolated boxes for missing frames inside each track (gaps up to `max_gap`)."""
+    rows = _sort_rows(_as_rows(rows))
+    d = np.diff(rows[:, 0])
+    fill = np.flatnonzero((rows[1:, 1] == rows[:-1, 1]) & (d > 1) & (d - 1 <= max_gap))
+    counts = (d[fill] - 1).astype(int)
+    if counts.sum() == 0:
+        return rows
+    src = np.repeat(fill, counts)
+    step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    t = (step / np.repeat(d[fill], counts))[:, None]
+    filled = np.column_stack((rows[src, 0] + step, rows[src, 1],
+                              rows[src, 2:6] + t * (rows[src + 1, 2:6] - rows[src, 2:6]), rows[src, 6]))
+    return _sort_rows(np.concatenate((rows, filled)))
+
+
+def _rts_batch(Z, lengths, q, r):
+    """
+    Constant-velocity Kalman filter + RTS smoother for K sequences of 4 independent coordinates at once.
+    Z: (K, L, 4) observations with NaN where missing; returns smoothed (K, L, 4) positions.
+    """
+    K, L, _ = Z.shape
+    F = np.array([[1., 1.], [0., 1.]])
+    Q = q * np.array([[1 / 3, 1 / 2], [1 / 2, 1.]])
+    x = np.zeros((K, 4, 2))
+    P = np.tile(np.diag([1e4, 1e4]), (K, 1, 1))
+    x_pred, P_pred = np.empty((K, L, 4, 2)), np.empty((K, L, 2, 2))
+    x_filt, P_filt = np.empty((K, L, 4, 2)), np.empty((K, L, 2, 2))
+
+    for t in range(L):
+        if t > 0:
+            x = x @ F.T
+            P = F @ P @ F.T + Q
+        x_pred[:, t], P_pred[:, t] = x, P
+        observed = ~np.isnan(Z[:, t, 0])
+        gain = P[:, :, 0] / (P[:, 0, 0] + r)[:, None]                      # (K, 2), H = [1, 0]
+        innovation = np.where(observed[:, None], Z[:, t] - x[:, :, 0], 0.)  # (K, 4)
+        x = x + innovation[:, :, None] * gain[:, None, :]
+        P = np.where(observed[:, None, None], P - gain[:, :, None] * P[:, None, 0, :], P)
+        x_filt[:, t], P_filt[:, t] = x, P
+
+    x_smooth = x_filt.copy()
+    for t in range(L - 2, -1, -1):
+        active = t < lengths - 1
+        C = P_filt[:, t] @ F.T @ np.linalg.inv(P_pred[:, t + 1])
+        update = x_filt[:, t] + np.einsum("kij,kcj->kci", C, x_smooth[:, t + 1] - x_pred[:, t + 1])
+        x_smooth[:, t] = np.where(active[:, None, None], update, x_smooth[:, t])
+    return x_smooth[..., 0]
+
+
+def smooth_rts(rows, max_gap=30, q=1.0, r=4.0, max_cells=1000000):
+    """
+    Kalman/RTS-smoothed boxes on every frame of each track segment (a segment ends at gaps above `max_gap`).
+    q, r: process (acceleration) and measurement noise variances in pixels^2.
+    """
+    rows = _sort_rows(_as_rows(rows))
+    if len(rows) == 0:
+        return rows
+    breaks = (rows[1:, 1] != rows[:-1, 1]) | (np.diff(rows[:, 0]) - 1 > max_gap)
+    segment = np.concatenate(([0], np.cumsum(breaks)))
+    seg_first = np.flatnonzero(np.concatenate(([True], breaks)))
+    seg_last = np.concatenate((seg_first[1:], [len(rows)])) - 1
+    lengths = (rows[seg_last, 0] - rows[seg_first, 0]).astype(int) + 1
+    offsets = (rows[:, 0] - rows[seg_first[segment], 0]).astype(int)
+    wh = rows[:, 4:6] - rows[:, 2:4]
+    cxcywh = np.column_stack((rows[:, 2:4] + wh / 2, wh))
+
+    # batch segments of similar length so padding stays small and each batch fits in `max_cells`
+    order = np.argsort(lengths, kind="stable")
+    outputs = []
+    start = 0
+    while start < len(order):
+        stop = start + 1
+        while stop < len(order) and (stop - start + 1) * lengths[order[stop]] <= max_cells:
+            stop += 1
+        batch = order[start:stop]
+        slot_of = np.full(len(seg_first), -1)
+        slot_of[batch] = np.arange(len(batch))
+        in_batch = slot_of[segment] >= 0
+        Z = np.full((len(batch), lengths[batch].max(), 4), np.nan)
+        Z[slot_of[segment[in_batch]], offsets[in_batch]] = cxcywh[in_batch]
+        smoothed = _rts_batch(Z, lengths[batch], q, r)
+
+        k = np.repeat(np.arange(len(batch)), lengths[batch])
+        t = np.arange(lengths[batch].sum()) - np.repeat(np.cumsum(lengths[batch]) - lengths[batch],
+                                                        lengths[batch])
+        c = smoothed[k, t]
+        c[:, 2:4] = np.maximum(c[:, 2:4], 1.)
+        first = seg_first[batch][k]
+        outputs.append(np.column_stack((rows[first, 0] + t, rows[first, 1],
+                                        c[:, :2] - c[:, 2:4] / 2, c[:, :2] + c[:, 2:4] / 2, rows[first, 6])))
+        start = stop
+    return _sort_rows(np.concatenate(outputs))
+
+
+# --- Post-pass ---
+
+def interpolate_tracks(rows, mode="linear", max_gap=30, link=True, min_iou=0.1):
+    """Link tracklets (optional) and fill gaps; returns (rows, number of links)."""
+    _check_max_gap(max_gap)
+    rows = _as_rows(rows)
+    links = 0
+    if link:
+        rows, links = link_tracklets(rows, max_gap=max_gap, min_iou=min_iou)
+    if mode == "linear":
+        return fill_linear(rows, max_gap), links
+    if mode == "rts":
+        return smooth_rts(rows, max_gap), links
+    raise ValueError(f"Unknown interpolation mode '{mode}' (use 'linear' or 'rts')")
+
+
+def interpolate_mot_file(path, output=None, mode="linear", max_gap=30, link=True, min_iou=0.1):
+    """Post-process a MOT result file; writes `<name>_<mode>.txt` next to it by default and returns a summary."""
+    if output is None:
+        stem, ext = os.path.splitext(path)
+        output = f"{stem}_{mode}{ext or '.txt'}"
+    start = time.perf_counter()
+    rows = load_mot(path)[:, [0, 1, 2, 3, 4, 5, 10]]    # trailing class column written by MOTSink / save_mot
+    result, links = interpolate_tracks(rows, mode, max_gap, link, min_iou)
+    save_mot(output, result)
+    return {"output": output, "boxes_in": len(rows), "boxes_out": len(result),
+            "ids_in": len(np.unique(rows[:, 1])), "ids_out": len(np.unique(result[:, 1])),
+            "links": links, "seconds": time.perf_counter() - start}
+
+
+def print_summary(summary):
+    print(f"Track post-pass written to {summary['output']} in {summary['seconds']:.2f} sec:")
+    print(f"  - IDs   : {summary['ids_in']} -> {summary['ids_out']} ({summary['links']} tracklet links)")
+    print(f"  - Boxes : {summary['boxes_in']} -> {summary['boxes_out']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tracklet linking and gap interpolation for MOT track files")
+    parser.add_argument("tracks", help="MOT result file (e.g. from MOTSink or Alex_Bewley_SORT.py)")
+    parser.add_argument("-o", "--output", default=None, help="Output file [<tracks>_<mode>.txt]")
+    parser.add_argument("--mode", choices=("linear", "rts"), default="linear", help="Gap filling [linear]")
+    parser.add_argument("--max-gap", type=gap_frames, default=30, help="Largest gap in frames to link / fill [30]")
+    parser.add_argument("--min-iou", type=float, default=0.1, help="Minimum IoU of the extrapolated box [0.1]")
+    parser.add_argument("--no-link", action="store_true", help="Only fill gaps inside existing IDs")
+    args = parser.parse_args()
+
+    print_summary(interpolate_mot_file(args.tracks, args.output, args.mode, args.max_gap, not args.no_link,
+                                       args.min_iou))
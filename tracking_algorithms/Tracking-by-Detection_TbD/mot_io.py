@@ -0,0 +1,50 @@
+"""
+mot_io.py
+---------
+Reading and writing MOTChallenge text files (ground truth, detections and tracker output).
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    MOT files hold one box per line: frame, id, left, top, width, height,
+    conf, then class / visibility (ground truth) or x, y, z (results). Boxes
+    are converted to [x1, y1, x2, y2] on load so they can go straight into the
+    vectorized IoU code. `save_mot` writes the same layout as `MOTSink`
+    (sinks.py): the standard 10 result columns (8-10 stay -1, column 8 is the
+    ground-truth class field where 1 = pedestrian) followed by an 11th column
+    with the track's class id. MOT tools read the first 10 columns only; the
+    interpolation post-pass uses the 11th to link same-class tracklets. It is
+    -1 where the class is unknown and absent in Alex_Bewley_SORT.py output.
+
+Dependencies:
+    pip install numpy
+"""
+
+import warnings
+
+import numpy as np
+
+MOT_LINE = '%d,%d,%.2f,%.2f,%.2f,%.2f,1,-1,-1,-1,%d'     # 10 MOTChallenge columns + class id
+
+
+def load_mot(path):
+    """(N, 11) float array [frame, id, x1, y1, x2, y2, col7, col8, col9, col10, class_id], -1 where absent."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)   # empty file
+        data = np.loadtxt(path, delimiter=",", ndmin=2)
+    rows = np.full((len(data), 11), -1.0)
+    if data.size:
+        rows[:, :min(11, data.shape[1])] = data[:, :11]
+        rows[:, 4:6] += rows[:, 2:4]
+    return rows
+
+
+def save_mot(path, rows):
+    """Write (N, 6 or 7) [frame, id, x1, y1, x2, y2(, class_id)] rows as MOT results, ordered by frame then id."""
+    rows = np.asarray(rows, dtype=float).reshape(-1, np.shape(rows)[-1] if np.size(rows) else 6)
+    rows = rows[np.lexsort((rows[:, 1], rows[:, 0]))]
+    classes = rows[:, 6] if rows.shape[1] > 6 else np.full(len(rows), -1.0)
+    with open(path, "w") as f:
+        for (frame, track_id, x1, y1, x2, y2), class_id in zip(rows[:, :6], classes):
+            print(MOT_LINE % (frame, track_id, x1, y1, x2 - x1, y2 - y1, class_id), file=f)
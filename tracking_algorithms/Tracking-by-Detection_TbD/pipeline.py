@@ -0,0 +1,214 @@
+"""
+pipeline.py
+-----------
+Shared capture -> detect -> track -> draw -> sink loop for all TbD trackers.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    `TrackingPipeline` drives a `VideoPersonDetector` (Object_detection_1.py)
+    and any tracker following the `Tracker` protocol (tracker_api.py). Frames
+    are read in batches of `batch_size` and detected with a single YOLO call,
+    then tracked, drawn (annotation.py) and handed to the configured sinks
+    (sinks.py) one by one. Per-stage timings (detection, tracking, drawing,
+    total) are collected so every tracker is benchmarked the same way.
+
+    Per-run state is bounded (windowed timings, `UniqueIdCounter`) so the loop
+    can run on 24/7 streams; soak_test.py checks this.
+
+Dependencies:
+    pip install ultralytics opencv-python numpy
+"""
+
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from annotation import AnnotationCompositor
+
+
+class PerformanceStats:
+    """
+    Per-stage timings with rolling and overall FPS. Only the last `window` samples are kept
+    (for the rolling figures); overall averages come from running totals, so memory stays
+    constant however long the stream runs.
+    """
+
+    def __init__(self, stages=("yolo", "tracker", "draw", "total"), window=30):
+        self.times = {stage: deque(maxlen=window) for stage in stages}
+        self._sum = dict.fromkeys(stages, 0.0)
+        self._count = dict.fromkeys(stages, 0)
+
+    def add(self, stage, seconds):
+        self.times[stage].append(seconds)
+        self._sum[stage] += seconds
+        self._count[stage] += 1
+
+    def rolling_fps(self, stage, window=30):
+        times = list(islice(reversed(self.times[stage]), window))
+        return len(times) / sum(times) if times and sum(times) > 0 else 0
+
+    def average_fps(self, stage):
+        return self._count[stage] / self._sum[stage] if self._sum[stage] > 0 else 0
+
+    def average_ms(self, stage):
+        return 1000 * self._sum[stage] / self._count[stage] if self._count[stage] else 0
+
+
+class UniqueIdCounter:
+    """
+    Counts distinct track IDs while only remembering IDs seen in the last `horizon` frames.
+    Trackers never revive an ID after their max age, so with `horizon` above it the count is exact:
+    by default it is the tracker's `max_age` plus `horizon_margin` (`default_horizon` if that is unknown).
+    """
+
+    horizon_margin = 30
+    default_horizon = 900
+
+    def __init__(self, horizon=None, max_age=None):
+        if horizon is None:
+            horizon = max_age + self.horizon_margin if max_age is not None else self.default_horizon
+        self.horizon = horizon
+        self.count = 0
+        self._last_seen = {}
+        self._frame = 0
+
+    def update(self, track_ids):
+        self._frame += 1
+        for track_id in track_ids:
+            if track_id not in self._last_seen:
+                self.count += 1
+            self._last_seen[track_id] = self._frame
+        if self._frame % self.horizon == 0:
+            oldest = self._frame - self.horizon
+            self._last_seen = {k: v for k, v in self._last_seen.items() if v > oldest}
+
+    def __len__(self):
+        return self.count
+
+
+class TrackingPipeline:
+    def __init__(self, detector, tracker, sinks=(), batch_size=1, label="Person",
+                 box_color=(255, 0, 0), font_scale=0.35, progress=True, overlay_every=1):
+        """Wire a detector, a `Tracker` and output sinks together."""
+        self.detector = detector
+        self.tracker = tracker
+        self.sinks = list(sinks)
+        self.batch_size = max(1, int(batch_size))
+        self.label = label
+        self.box_color = box_color
+        self.font_scale = font_scale
+        self.progress = progress
+
+        self.cap = detector.cap
+        self.info = detector.get_video_info()
+        self.class_names = getattr(detector, "class_names", None)
+        class_ids = getattr(detector, "class_ids", None)
+        if self.class_names and class_ids is not None:
+            self.tracked_classes = ", ".join(self.class_names[int(c)] for c in class_ids)
+        else:
+            self.tracked_classes = "all"
+        self.annotator = AnnotationCompositor(label=label, color=box_color, font_scale=font_scale,
+                                              class_names=self.class_names, every=overlay_every)
+        self.stats = PerformanceStats()
+        self.unique_ids = UniqueIdCounter(max_age=getattr(tracker, "max_age", None))
+        self.frame_count = 0
+
+    def _read_batch(self):
+        frames = []
+        while len(frames) < self.batch_size:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        return frames
+
+    def print_video_info(self):
+        print("Video Information:")
+        print(f"  - Resolution  : {self.info['width']}x{self.info['height']}")
+        print(f"  - FPS          : {self.info['fps']}")
+        print(f"  - Total Frames : {self.info['total_frames']}")
+        print(f"  - Tracker      : {self.tracker.name}")
+        print(f"  - Tracking     : {self.tracked_classes}\n")
+
+    def process_frame(self, frame, detections):
+        """Track, draw and sink a single frame. Returns False when a sink requests a stop."""
+        self.frame_count += 1
+
+        # --- TRACKING ---
+        start_tracker = time.time()
+        tracks = self.tracker.update(detections, frame)
+        self.stats.add("tracker", time.time() - start_tracker)
+
+        # --- DRAW RESULTS ---
+        self.unique_ids.update(tracks[:, 4].astype(int).tolist())
+        start_draw = time.time()
+        self.annotator.draw(frame, tracks)
+        self.stats.add("draw", time.time() - start_draw)
+
+        # --- SHOW / SAVE FRAME ---
+        keep_going = True
+        for sink in self.sinks:
+            if sink.write(self.frame_count, frame, tracks) is False:
+                keep_going = False
+        return keep_going
+
+    def run(self):
+        """Main tracking loop; returns the collected `PerformanceStats`."""
+        self.print_video_info()
+        start_time_total = time.time()
+
+        try:
+            keep_going = True
+            while keep_going:
+                frames = self._read_batch()
+                if not frames:
+                    break
+
+                # --- YOLO DETECTION (one call per batch, cost shared by its frames) ---
+                start_yolo = time.time()
+                batch_detections = self.detector.detect_batch(frames)
+                yolo_time = (time.time() - start_yolo) / len(frames)
+
+                for frame, detections in zip(frames, batch_detections):
+                    frame_start = time.time()
+                    self.stats.add("yolo", yolo_time)
+                    keep_going = self.process_frame(frame, detections)
+                    self.stats.add("total", yolo_time + time.time() - frame_start)
+                    self._print_progress()
+                    if not keep_going:
+                        break
+        finally:
+            self._print_summary(time.time() - start_time_total)
+            for sink in self.sinks:
+                sink.close()
+            self.detector.cleanup()
+
+        return self.stats
+
+    def _print_progress(self):
+        if not self.progress:
+            return
+        sys.stdout.write(
+            f"\rFrame {self.frame_count}/{self.info['total_frames']} | "
+            f"YOLO: {self.stats.rolling_fps('yolo'):.2f} FPS | "
+            f"{self.tracker.name}: {self.stats.rolling_fps('tracker'):.2f} FPS | "
+            f"Overall: {self.stats.rolling_fps('total'):.2f} FPS"
+        )
+        sys.stdout.flush()
+
+    def _print_summary(self, total_elapsed):
+        name = self.tracker.name
+        print("\n\nPerformance Summary:")
+        print(f"  - Avg YOLO FPS     : {self.stats.average_fps('yolo'):.2f}")
+        print(f"  - Avg {name} FPS{' ' * max(1, 10 - len(name))}: {self.stats.average_fps('tracker'):.2f}")
+        print(f"  - Avg Draw time    : {self.stats.average_ms('draw'):.2f} ms/frame")
+        print(f"  - Avg Total FPS    : {self.stats.average_fps('total'):.2f}")
+        print(f"  - Total frames     : {self.frame_count}")
+        print(f"  - Total time       : {total_elapsed:.2f} sec")
+        print(f"  - Total unique objects tracked: {len(self.unique_ids)}")
+        print("\nTracking completed successfully!")
+        if self.info.get("output_path"):
+            print(f"Output video saved at: {self.info['output_path']}")
@@ -0,0 +1,294 @@
+"""
+shm_executor.py
+---------------
+GIL-free multi-stream tracking: tracker workers in separate processes fed through shared memory.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Tracker updates (`Sort.update`, `DeepSort.update_tracks`, ...) are Python-bound
+    and compete for the GIL with decoding and drawing. `ProcessPoolTrackerExecutor`
+    runs them in worker processes instead:
+
+        - frames (optional) and detection arrays are written by the main process
+          into per-stream ring buffers in `multiprocessing.shared_memory`,
+        - only a tiny (stream_id, slot, frame_idx) tuple goes through a queue,
+        - workers read the slot in place (no pickling of arrays), update the
+          tracker that owns the stream and write the track array back into a
+          shared output ring.
+
+    Each stream is pinned to one worker, so its frames are tracked in order and
+    its IDs are identical to an in-process run. A stream's ring slot is only
+    reused after its result has been received.
+
+    Gains need real parallelism: each worker needs a free core, and each frame
+    needs enough tracker work to outweigh the queue round trip (roughly
+    0.1 ms). With few objects, or with more workers than cores, the pool is
+    slower than an in-process loop. Measure with the benchmark below on the
+    target host. track.py does not use the executor, because it tracks one
+    stream and a stream's updates are sequential. Use the executor from
+    multi-camera services instead.
+
+    A worker that dies without reporting (killed, or crashed in a native
+    backend) is noticed within `poll_interval` seconds. The executor is then
+    closed and a RuntimeError is raised, so the caller does not wait forever.
+
+    Usage (multi-camera scaling benchmark on synthetic detections):
+        python shm_executor.py --tracker sort --streams 16 --frames 1000 --workers 1 2 4 8
+
+Dependencies:
+    pip install numpy (plus the tracker backend, see tracker_api.py)
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from synthetic import synthetic_detection_stream
+from tracker_api import build_tracker
+
+
+class SharedRing:
+    """A NumPy array living in a named shared-memory block (created by the owner, attached by workers)."""
+
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner \
+            else shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def spec(self):
+        return self.shm.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _serve(task_queue, result_queue, trackers, rings):
+    dets_ring, det_counts = rings["dets"].array, rings["det_counts"].array
+    tracks_ring = rings["tracks"].array
+    frames_ring = rings["frames"].array if "frames" in rings else None
+    max_tracks = tracks_ring.shape[2]
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        stream_id, slot, frame_idx = task
+        dets = dets_ring[stream_id, slot, :det_counts[stream_id, slot]]
+        frame = frames_ring[stream_id, slot] if frames_ring is not None else None
+
+        tracks = trackers[stream_id].update(dets, frame)
+        if len(tracks) > max_tracks:
+            raise ValueError(f"Stream {stream_id} produced {len(tracks)} tracks; max_tracks is {max_tracks}")
+        tracks_ring[stream_id, slot, :len(tracks)] = tracks[:, :6]
+        result_queue.put((stream_id, slot, frame_idx, len(tracks)))
+
+
+def _tracker_worker(task_queue, result_queue, tracker_name, tracker_kwargs, specs, stream_ids):
+    """Worker process: one tracker per owned stream, arrays read from and written to shared memory in place."""
+    rings = {}
+    try:
+        rings = {key: SharedRing.attach(spec) for key, spec in specs.items()}
+        trackers = {stream_id: build_tracker(tracker_name, **tracker_kwargs) for stream_id in stream_ids}
+        _serve(task_queue, result_queue, trackers, rings)
+    except Exception:
+        result_queue.put(("error", traceback.format_exc(), None, None))
+    finally:
+        for ring in rings.values():
+            ring.close()
+
+
+class ProcessPoolTrackerExecutor:
+    poll_interval = 1.0  # seconds between worker liveness checks while waiting for a result
+
+    def __init__(self, tracker_name, num_streams, num_workers=None, tracker_kwargs=None, slots=8,
+                 max_detections=512, max_tracks=512, frame_shape=None):
+        """
+        tracker_name   : registered tracker (see tracker_api.TRACKERS), one instance per stream
+        num_workers    : worker processes (default: CPU count, at most one per stream)
+        slots          : ring depth per stream, i.e. frames that may be in flight
+        frame_shape    : (H, W, 3) to also share frames (needed by DeepSORT), None for detections only
+        """
+        self.num_streams = num_streams
+        self.num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_streams))
+        self.slots = slots
+        self.max_detections = max_detections
+
+        # --- Shared-memory rings: (stream, slot, ...) ---
+        self.rings = {
+            "dets": SharedRing((num_streams, slots, max_detections, 6), np.float64),
+            "det_counts": SharedRing((num_streams, slots), np.int64),
+            "tracks": SharedRing((num_streams, slots, max_tracks, 6), np.float64),
+        }
+        if frame_shape is not None:
+            self.rings["frames"] = SharedRing((num_streams, slots) + tuple(frame_shape), np.uint8)
+        specs = {key: ring.spec() for key, ring in self.rings.items()}
+
+        self._in_flight = np.zeros(num_streams, dtype=int)
+        self._next_slot = np.zeros(num_streams, dtype=int)
+        self._frame_idx = np.zeros(num_streams, dtype=int)
+
+        # --- Workers; stream s is owned by worker s % num_workers ---
+        ctx = mp.get_context("spawn")
+        self._result_queue = ctx.Queue()
+        self._task_queues = [ctx.Queue() for _ in range(self.num_workers)]
+        self._workers = []
+        for w, task_queue in enumerate(self._task_queues):
+            stream_ids = list(range(w, num_streams, self.num_workers))
+            process = ctx.Process(target=_tracker_worker, daemon=True,
+                                  args=(task_queue, self._result_queue, tracker_name, tracker_kwargs or {},
+                                        specs, stream_ids))
+            process.start()
+            self._workers.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _receive(self):
+        while True:
+            try:
+                stream_id, slot, frame_idx, n = self._result_queue.get(timeout=self.poll_interval)
+                break
+            except queue.Empty:
+                # a worker killed from outside (OOM killer, segfault in a backend) never reports back
+                dead = [process for process in self._workers if not process.is_alive()]
+                if dead:
+                    self.close()
+                    raise RuntimeError(f"Tracker worker {dead[0].name} exited unexpectedly "
+                                       f"(exit code {dead[0].exitcode})") from None
+        if stream_id == "error":
+            self.close()
+            raise RuntimeError(f"Tracker worker failed:\n{slot}")
+        tracks = self.rings["tracks"].array[stream_id, slot, :n].copy()
+        self._in_flight[stream_id] -= 1
+        return stream_id, frame_idx, tracks
+
+    def submit(self, stream_id, detections, frame=None):
+        """
+        Queue one frame of `stream_id` for tracking. Blocks only while that stream's ring is full.
+        Returns the (stream_id, frame_idx, tracks) results that completed meanwhile.
+        """
+        completed = []
+        while self._in_flight[stream_id] >= self.slots:
+            completed.append(self._receive())
+
+        dets = np.asarray(detections, dtype=np.float64).reshape(-1, 6)
+        if len(dets) > self.max_detections:
+            raise ValueError(f"{len(dets)} detections exceed max_detections={self.max_detections}")
+        slot = int(self._next_slot[stream_id])
+        self.rings["dets"].array[stream_id, slot, :len(dets)] = dets
+        self.rings["det_counts"].array[stream_id, slot] = len(dets)
+        if frame is not None:
+            self.rings["frames"].array[stream_id, slot] = frame
+
+        self._frame_idx[stream_id] += 1
+        self._next_slot[stream_id] = (slot + 1) % self.slots
+        self._in_flight[stream_id] += 1
+        self._task_queues[stream_id % self.num_workers].put((stream_id, slot, int(self._frame_idx[stream_id])))
+        return completed
+
+    def drain(self):
+        """Wait for every queued frame and return their results."""
+        completed = []
+        while self._in_flight.sum() > 0:
+            completed.append(self._receive())
+        return completed
+
+    def close(self):
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
+
+
+# --- Multi-camera benchmark ---
+
+def _run_in_process(tracker_name, streams, tracker_kwargs):
+    trackers = [build_tracker(tracker_name, **tracker_kwargs) for _ in streams]
+    outputs = [[] for _ in streams]
+    for frame_idx in range(len(streams[0])):
+        for stream_id, stream in enumerate(streams):
+            outputs[stream_id].append(trackers[stream_id].update(stream[frame_idx]))
+    return outputs
+
+
+def _run_executor(tracker_name, streams, tracker_kwargs, num_workers):
+    outputs = [[] for _ in streams]
+    with ProcessPoolTrackerExecutor(tracker_name, len(streams), num_workers, tracker_kwargs) as executor:
+        start = time.perf_counter()  # exclude worker start-up (interpreter + imports)
+        results = []
+        for frame_idx in range(len(streams[0])):
+            for stream_id, stream in enumerate(streams):
+                results.extend(executor.submit(stream_id, stream[frame_idx]))
+        results.extend(executor.drain())
+        elapsed = time.perf_counter() - start
+    for stream_id, frame_idx, tracks in sorted(results, key=lambda r: (r[0], r[1])):
+        outputs[stream_id].append(tracks)
+    return outputs, elapsed
+
+
+def benchmark_multicamera(tracker_name="sort", num_streams=16, num_frames=1000, num_objects=30,
+                          workers=(1, 2, 4, 8), tracker_kwargs=None):
+    """Throughput (frames/s over all streams) of in-process tracking vs. the process pool."""
+    tracker_kwargs = tracker_kwargs or {}
+    streams = [list(synthetic_detection_stream(num_frames, num_objects=num_objects, seed=s))
+               for s in range(num_streams)]
+    total_frames = num_streams * num_frames
+
+    start = time.perf_counter()
+    reference = _run_in_process(tracker_name, streams, tracker_kwargs)
+    rows = [("in-process (1 core)", total_frames / (time.perf_counter() - start), True)]
+
+    for num_workers in workers:
+        outputs, elapsed = _run_executor(tracker_name, streams, tracker_kwargs, num_workers)
+        identical = all(np.array_equal(a, b) for ref, out in zip(reference, outputs) for a, b in zip(ref, out))
+        rows.append((f"process pool, {num_workers} worker(s)", total_frames / elapsed, identical))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-camera tracking throughput with shared-memory workers")
+    parser.add_argument("--tracker", default="sort", help="Tracker backend [sort]")
+    parser.add_argument("--streams", type=int, default=16, help="Simulated cameras [16]")
+    parser.add_argument("--frames", type=int, default=1000, help="Frames per camera [1000]")
+    parser.add_argument("--objects", type=int, default=30, help="Objects per camera [30]")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to test")
+    args = parser.parse_args()
+
+    if max(args.workers) > (os.cpu_count() or 1):
+        print(f"Note: only {os.cpu_count()} CPU(s); worker counts above that can only add overhead\n")
+    rows = benchmark_multicamera(args.tracker, args.streams, args.frames, args.objects, args.workers)
+    baseline = rows[0][1]
+    print(f"Multi-camera tracking: {args.tracker}, {args.streams} streams x {args.frames} frames, "
+          f"{args.objects} objects/stream, {os.cpu_count()} CPUs")
+    for title, fps, identical in rows:
+        print(f"  - {title:<26}: {fps:10.1f} frames/s  ({fps / baseline:5.2f}x)"
+              f"{'' if identical else '  [OUTPUT MISMATCH]'}")
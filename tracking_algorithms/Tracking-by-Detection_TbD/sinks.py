@@ -0,0 +1,133 @@
+"""
+sinks.py
+--------
+Output stages for the Tracking-by-Detection pipeline.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    A sink receives every processed frame together with its track array
+    ([x1, y1, x2, y2, track_id] rows) through `write(frame_idx, frame, tracks)`.
+    Returning False from `write` asks the pipeline to stop (e.g. 'q' pressed
+    in the display window). `close()` is called once at the end of the run.
+
+    Event sinks (`EventLogSink`) receive the analytics events of a frame
+    (analytics.py) through `write_events(events)` instead.
+
+    File sinks take `resume_frame` when a run resumes from a snapshot
+    (checkpoint.py): records up to that frame are kept, later ones (written
+    after the snapshot by the interrupted run) are dropped, and new records
+    follow. `flush()` is called before every snapshot, so everything the
+    snapshot covers is on disk.
+
+Dependencies:
+    pip install opencv-python numpy
+"""
+
+import json
+import os
+
+import cv2
+
+from mot_io import MOT_LINE
+
+
+def open_output(path, resume_frame=None, frame_of=None):
+    """
+    Open a line-based output file for writing. Without `resume_frame` it is truncated; otherwise the lines
+    with `frame_of(line) <= resume_frame` are kept and the returned file continues after them.
+    """
+    kept = []
+    if resume_frame is not None and os.path.exists(path):
+        with open(path) as f:
+            kept = [line for line in f if line.strip() and frame_of(line) <= resume_frame]
+    file = open(path, "w")
+    file.writelines(kept)
+    return file
+
+
+class FrameSink:
+    """Base class; subclasses override `write` and optionally `flush` / `close`."""
+
+    def write(self, frame_idx, frame, tracks):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class VideoFileSink(FrameSink):
+    """Writes annotated frames to an opened `cv2.VideoWriter`."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    @classmethod
+    def open(cls, path, fps, size, fourcc="mp4v"):
+        return cls(cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size))
+
+    def write(self, frame_idx, frame, tracks):
+        self.writer.write(frame)
+        return True
+
+    def close(self):
+        self.writer.release()
+
+
+class DisplaySink(FrameSink):
+    """Shows frames in an OpenCV window; pressing 'q' stops the run."""
+
+    def __init__(self, window_name="Tracking"):
+        self.window_name = window_name
+
+    def write(self, frame_idx, frame, tracks):
+        cv2.imshow(self.window_name, frame)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("\nTracking stopped by user")
+            return False
+        return True
+
+    def close(self):
+        cv2.destroyWindow(self.window_name)
+
+
+class MOTSink(FrameSink):
+    """Writes tracks in MOTChallenge text format (see mot_io.py), with the class id as an 11th column."""
+
+    def __init__(self, path, resume_frame=None):
+        self.path = path
+        self.file = open_output(path, resume_frame, lambda line: int(line.split(",", 1)[0]))
+
+    def write(self, frame_idx, frame, tracks):
+        for d in tracks:
+            class_id = d[5] if len(d) > 5 else -1
+            print(MOT_LINE % (frame_idx, d[4], d[0], d[1], d[2] - d[0], d[3] - d[1], class_id), file=self.file)
+        return True
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class EventLogSink:
+    """Writes analytics events (dicts, see analytics.py) to a JSON-lines file, one per line (truncates the file)."""
+
+    def __init__(self, path, resume_frame=None):
+        self.path = path
+        self.file = open_output(path, resume_frame, lambda line: json.loads(line)["frame"])
+
+    def write_events(self, events):
+        for event in events:
+            self.file.write(json.dumps(event) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
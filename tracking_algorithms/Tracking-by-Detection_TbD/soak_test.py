@@ -0,0 +1,153 @@
+"""
+soak_test.py
+------------
+Memory soak test: long synthetic streams through the trackers with a flat-memory assertion.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Long feeds used to grow memory without bound (per-frame timing lists, the
+    set of unique IDs, SORT box histories, ID remapping tables, DeepSORT
+    appearance galleries). Every per-stream structure is now bounded or a
+    windowed aggregate. This harness checks that it stays that way.
+
+    For each tracker it runs the same per-frame work as `TrackingPipeline`,
+    without video: tracker update, `PerformanceStats`, `UniqueIdCounter` and an
+    `AnalyticsEngine` with a zone and a counting line. It uses a synthetic
+    stream with a high respawn rate, so tracks and IDs churn all the time.
+
+    Bounded state only reaches its steady size once every pruning horizon has
+    passed. These are the `UniqueIdCounter` horizon and the class-partition ID
+    TTL (both the tracker's max age plus a margin) and the analytics max age.
+    Each is pruned once per
+    horizon, so it can hold up to two horizons of entries. The warm-up is
+    therefore twice the longest horizon.
+
+    After the warm-up, tracemalloc samples are taken at regular checkpoints.
+    Single samples swing by up to ~150 KB with the number of live tracks (a
+    SORT track holds ~12 KB of Kalman state), so the verdict uses the trend: a
+    straight line is fitted to the later half of the checkpoints, and the run
+    fails (exit status 1) if its slope exceeds --max-bytes-per-frame. It then
+    prints the source lines that grew the most. With the defaults (6000
+    measured frames, 150 checkpoints; two to four minutes per tracker under
+    tracemalloc) flat runs fit within +-2 B/frame, so the 8 B/frame limit
+    (~20 MB/day at 30 FPS, or ~30 bytes per new ID at this churn) leaves
+    margin for noise. Longer runs (--frames) tighten the fit.
+
+    Usage:
+        python soak_test.py --trackers sort bytetrack
+        python soak_test.py --trackers sort --frames 200000       # long run (about an hour)
+        python soak_test.py --trackers deepsort --frames 10000    # CNN embeddings are slow
+
+Dependencies:
+    pip install numpy (plus the tracker backends, see tracker_api.py)
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from analytics import AnalyticsEngine, CountingLine, Zone
+from pipeline import PerformanceStats, UniqueIdCounter
+from synthetic import synthetic_detection_stream
+from tracker_api import build_tracker
+
+
+def warmup_frames(tracker, unique_ids, engine):
+    """Frames until every pruned structure has reached its steady size (twice the longest horizon)."""
+    horizons = [unique_ids.horizon, engine.max_age, getattr(tracker, "id_ttl", 0)]
+    return 2 * max(horizons)
+
+
+def late_trend(frames, samples):
+    """Slope of a line fitted to the later half of the checkpoints: (bytes per frame, KB over that half)."""
+    half = len(samples) // 2
+    if len(samples) - half < 2:
+        return 0.0, 0.0
+    slope = np.polyfit(frames[half:], samples[half:], 1)[0]     # KB per frame
+    return slope * 1024, slope * (frames[-1] - frames[half])
+
+
+def soak(tracker_name, num_frames, num_objects=30, checkpoints=150, warmup=None, respawn_rate=0.01,
+         width=640, height=360, seed=0):
+    """
+    Run one tracker for `num_frames` (after a warm-up of `warmup` frames, by default twice the longest
+    pruning horizon); returns (traced KB per checkpoint, frames per checkpoint, top growth, stats, unique IDs).
+    """
+    tracker = build_tracker(tracker_name)
+    stats = PerformanceStats()
+    unique_ids = UniqueIdCounter(max_age=tracker.max_age)
+    engine = AnalyticsEngine([Zone("left", [[0, 0], [width / 2, 0], [width / 2, height], [0, height]])],
+                             [CountingLine("middle", [[0, height / 2], [width, height / 2]])], fps=30)
+    frame = np.zeros((height, width, 3), dtype=np.uint8) if tracker_name == "deepsort" else None
+
+    warmup = warmup_frames(tracker, unique_ids, engine) if warmup is None else warmup
+    every = max(1, num_frames // checkpoints)
+    samples, frames, baseline = [], [], None
+
+    tracemalloc.start()
+    stream = synthetic_detection_stream(warmup + num_frames, num_objects=num_objects, width=width,
+                                        height=height, seed=seed, respawn_rate=respawn_rate)
+    for frame_idx, detections in enumerate(stream, start=1):
+        start = time.perf_counter()
+        tracks = tracker.update(detections, frame)
+        stats.add("tracker", time.perf_counter() - start)
+        unique_ids.update(tracks[:, 4].astype(int).tolist())
+        engine.update(frame_idx, tracks)
+        stats.add("total", time.perf_counter() - start)
+
+        if frame_idx >= warmup and (frame_idx - warmup) % every == 0:
+            gc.collect()
+            if baseline is None:
+                baseline = tracemalloc.take_snapshot()
+            samples.append(tracemalloc.get_traced_memory()[0] / 1024)
+            frames.append(frame_idx)
+
+    gc.collect()
+    top = tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:5] if baseline is not None else []
+    tracemalloc.stop()
+    return samples, frames, top, stats, unique_ids
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Long-run memory soak test for the TbD trackers")
+    parser.add_argument("--trackers", nargs="+", default=["sort", "bytetrack"], help="Trackers to soak")
+    parser.add_argument("--frames", type=int, default=6000, help="Measured frames per tracker, after warm-up [6000]")
+    parser.add_argument("--objects", type=int, default=30, help="Objects per frame [30]")
+    parser.add_argument("--checkpoints", type=int, default=150, help="tracemalloc samples after warm-up [150]")
+    parser.add_argument("--warmup", type=int, default=None,
+                        help="Frames before the first checkpoint [twice the longest pruning horizon]")
+    parser.add_argument("--respawn-rate", type=float, default=0.01, help="Per-object respawn probability [0.01]")
+    parser.add_argument("--max-bytes-per-frame", type=float, default=8,
+                        help="Allowed fitted growth per frame over the later half of the checkpoints [8]")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    failures = 0
+    for name in args.trackers:
+        start = time.time()
+        samples, frames, top, stats, unique_ids = soak(name, args.frames, args.objects, args.checkpoints,
+                                                       args.warmup, args.respawn_rate)
+        per_frame, growth = late_trend(frames, samples)
+        ok = per_frame <= args.max_bytes_per_frame
+        failures += not ok
+        print(f"{name}: {frames[-1] if frames else 0} frames ({frames[0] if frames else 0} warm-up) in "
+              f"{time.time() - start:.1f} sec ({stats.average_fps('total'):.0f} FPS), {len(unique_ids)} unique IDs")
+        print(f"  - traced memory: {samples[0] if samples else 0:.1f} -> {samples[-1] if samples else 0:.1f} KB "
+              f"(range {np.ptp(samples) if samples else 0:.1f} KB); later-half trend {per_frame:+.2f} B/frame "
+              f"({growth:+.1f} KB)  {'OK' if ok else 'GROWING'}")
+        if not ok:
+            for stat in top:
+                print(f"      {stat}")
+
+    if failures:
+        print("\nFAILED: memory grows with stream length")
+        sys.exit(1)
+    print("\nOK: memory profile is flat")
@@ -0,0 +1,50 @@
+"""
+synthetic.py
+------------
+Synthetic detection streams for tracker benchmarks and stress / soak tests.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Generates reproducible per-frame detection arrays without a video or a
+    detector: boxes move at constant velocity, bounce off the frame edges,
+    get positional noise and random missed detections, and are occasionally
+    replaced by new objects so trackers keep creating and retiring tracks.
+
+Dependencies:
+    pip install numpy
+"""
+
+import numpy as np
+
+
+def synthetic_detection_stream(num_frames, num_objects=20, width=640, height=360, seed=0,
+                               miss_rate=0.05, noise=2.0, respawn_rate=0.002, num_classes=1):
+    """Yield `num_frames` (N, 6) arrays of [x1, y1, x2, y2, score, class_id]; same seed -> same stream."""
+    rng = np.random.default_rng(seed)
+    bounds = np.array([width, height], dtype=float)
+
+    def spawn(n):
+        return (rng.uniform(0, 1, (n, 2)) * bounds,       # centre
+                rng.normal(0, 3, (n, 2)),                 # velocity
+                rng.uniform([20, 40], [60, 120], (n, 2)),  # width, height
+                rng.integers(0, num_classes, n))          # class
+
+    pos, vel, size, classes = spawn(num_objects)
+    for _ in range(num_frames):
+        # replace a few objects so tracks are born and die during the stream
+        respawn = rng.random(num_objects) < respawn_rate
+        if respawn.any():
+            pos[respawn], vel[respawn], size[respawn], classes[respawn] = spawn(int(respawn.sum()))
+
+        pos += vel
+        outside = (pos < 0) | (pos > bounds)
+        vel[outside] *= -1
+        np.clip(pos, 0, bounds, out=pos)
+
+        visible = rng.random(num_objects) >= miss_rate
+        n = int(visible.sum())
+        centre = pos[visible] + rng.normal(0, noise, (n, 2))
+        half = size[visible] / 2
+        yield np.column_stack((centre - half, centre + half, rng.uniform(0.5, 1.0, n), classes[visible]))
@@ -0,0 +1,175 @@
+"""
+track.py
+--------
+Single command-line entry point for all Tracking-by-Detection trackers.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Wires YOLOv8 person detection (Object_detection_1.py) into the chosen
+    tracker (tracker_api.py) and output sinks (sinks.py) through the shared
+    `TrackingPipeline` (pipeline.py).
+
+    Examples:
+        python track.py --tracker sort --input Sample_Video.mp4
+        python track.py --tracker deepsort --device cpu --threads 4 --no-display
+        python track.py --tracker bytetrack --batch-size 8 --mot-output bytetrack.txt --no-video
+        python track.py --tracker sort --runtime openvino_int8.json --device cpu
+        python track.py --tracker sort --classes person car truck backpack handbag suitcase
+        python track.py --tracker sort --snapshot cam01.npz --resume cam01.npz
+        python track.py --tracker bytetrack --analytics zones.json --events-output events.jsonl
+        python track.py --tracker sort --no-display --mot-output sort.txt --interpolate rts
+
+Dependencies:
+    pip install ultralytics opencv-python numpy
+    (plus the selected tracker backend, see tracker_api.py)
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+
+# --- Add project root (Object_detection_1.py) and this folder to sys.path ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../.."))
+for path in (PROJECT_ROOT, CURRENT_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from tracker_api import TRACKERS, build_tracker
+from pipeline import TrackingPipeline
+from sinks import DisplaySink, EventLogSink, MOTSink, VideoFileSink
+from analytics import AnalyticsEngine, AnalyticsSink
+from checkpoint import SnapshotSink, load_snapshot
+from interpolation import gap_frames, interpolate_mot_file, print_summary
+from preprocessing import stride_multiple
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="YOLOv8 + SORT / ByteTrack / DeepSORT multi-object tracking")
+    parser.add_argument("--tracker", choices=sorted(TRACKERS), default="sort", help="Tracker backend [sort]")
+    parser.add_argument("--input", default="Sample_Video.mp4", help="Input video, relative to the project root")
+    parser.add_argument("--output", default=None,
+                        help="Output video [Sample_Video_Tracked_<TRACKER>.mp4 next to the input]")
+    parser.add_argument("--no-video", action="store_true", help="Do not write an output video")
+    parser.add_argument("--mot-output", default=None, help="Also write tracks in MOTChallenge text format")
+    parser.add_argument("--no-display", action="store_true", help="Do not open a live preview window")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO weights [yolov8n.pt]")
+    parser.add_argument("--runtime", default=None,
+                        help="Detector runtime: pytorch, onnx, openvino or a JSON config (see detector_runtimes.py)")
+    parser.add_argument("--device", default=None, help="Inference device, e.g. cpu, 0, cuda:0 [auto]")
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads for OpenCV and PyTorch")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames per YOLO call [1]")
+    parser.add_argument("--imgsz", type=stride_multiple, default=640, help="Inference input size, a multiple of 32 [640]")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="Letterbox into reused buffers before YOLO (see preprocessing.py; benchmark it first)")
+    parser.add_argument("--adaptive-imgsz", action="store_true",
+                        help="Adapt the input size to object scale and --latency-budget (PyTorch runtime only)")
+    parser.add_argument("--latency-budget", type=float, default=None, help="Target detector latency in ms/frame")
+    parser.add_argument("--classes", nargs="+", default=["person"],
+                        help="COCO class names or ids to track, e.g. person car truck backpack handbag [person]")
+    parser.add_argument("--overlay-every", type=int, default=1, help="Lay out boxes and captions every N frames [1]")
+    parser.add_argument("--snapshot", default=None, help="Periodically save the tracker state to this .npz file")
+    parser.add_argument("--snapshot-every", type=int, default=300, help="Frames between snapshots [300]")
+    parser.add_argument("--resume", default=None, help="Resume tracker / analytics state and video position from a snapshot "
+                             "(--mot-output / --events-output continue after the snapshot frame; a new "
+                             "output video holds the resumed frames only)")
+    parser.add_argument("--analytics", default=None,
+                        help="Zones / counting lines JSON config for occupancy, crossing and dwell analytics")
+    parser.add_argument("--events-output", default=None, help="Write analytics events as JSON lines to this file")
+    parser.add_argument("--interpolate", choices=("linear", "rts"), default=None,
+                        help="Offline post-pass on --mot-output: link tracklets and fill gaps (see interpolation.py)")
+    parser.add_argument("--max-gap", type=gap_frames, default=30, help="Largest gap in frames for --interpolate [30]")
+
+    # --- Tracker parameters (only the ones relevant to --tracker are used) ---
+    parser.add_argument("--max-age", type=int, default=None,
+                        help="Frames to keep a track alive without detections (lost_track_buffer for ByteTrack)")
+    parser.add_argument("--min-hits", type=int, default=None,
+                        help="Detections before a track is confirmed (n_init for DeepSORT)")
+    parser.add_argument("--iou-threshold", type=float, default=None, help="SORT: minimum IoU for a match")
+    parser.add_argument("--max-cosine-distance", type=float, default=None, help="DeepSORT: appearance threshold")
+    return parser.parse_args(argv)
+
+
+def tracker_kwargs(args, fps):
+    """Map the generic CLI options onto the keyword arguments of the chosen adapter."""
+    if args.tracker == "sort":
+        options = {"max_age": args.max_age, "min_hits": args.min_hits, "iou_threshold": args.iou_threshold}
+    elif args.tracker == "bytetrack":
+        options = {"lost_track_buffer": args.max_age, "frame_rate": fps}
+    else:
+        options = {"max_age": args.max_age, "n_init": args.min_hits,
+                   "max_cosine_distance": args.max_cosine_distance}
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def configure_threads(threads):
+    """Limit OpenCV and PyTorch intra-op threads."""
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.interpolate and not args.mot_output:
+        raise SystemExit("--interpolate post-processes the MOT output; add --mot-output <file>")
+    if args.threads:
+        configure_threads(args.threads)
+
+    from Object_detection_1 import VideoPersonDetector
+
+    tracker_cls = TRACKERS[args.tracker]
+    output_video = None
+    if not args.no_video:
+        stem = os.path.splitext(args.input)[0]
+        output_video = args.output or f"{stem}_Tracked_{tracker_cls.name}.mp4"
+
+    detector = VideoPersonDetector(input_video=args.input, output_video=output_video,
+                                   model_path=args.model, device=args.device, runtime=args.runtime,
+                                   classes=[int(c) if c.isdigit() else c for c in args.classes],
+                                   imgsz=args.imgsz, preprocess=args.preprocess, adaptive_imgsz=args.adaptive_imgsz,
+                                   latency_budget=args.latency_budget / 1000 if args.latency_budget else None)
+    tracker = build_tracker(args.tracker, **tracker_kwargs(args, detector.fps))
+
+    engine = AnalyticsEngine.from_config(args.analytics, fps=detector.fps) if args.analytics else None
+
+    start_frame, resume_frame = 0, None
+    if args.resume:
+        start_frame = resume_frame = load_snapshot(tracker, args.resume, analytics=engine)
+        detector.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        print(f"Resumed {tracker.name} state from {args.resume} at frame {start_frame}")
+
+    # --- File outputs keep their records up to the snapshot frame when resuming ---
+    sinks = []
+    if detector.out is not None:
+        sinks.append(VideoFileSink(detector.out))
+    if args.mot_output:
+        sinks.append(MOTSink(args.mot_output, resume_frame=resume_frame))
+    if engine is not None:
+        event_sinks = [EventLogSink(args.events_output, resume_frame=resume_frame)] if args.events_output else []
+        sinks.append(AnalyticsSink(engine, event_sinks))
+    if args.snapshot:
+        sinks.append(SnapshotSink(tracker, args.snapshot, every=args.snapshot_every, analytics=engine,
+                                  outputs=list(sinks)))
+    if not args.no_display:
+        sinks.append(DisplaySink(f"{tracker.name} Tracking"))
+
+    pipeline = TrackingPipeline(detector, tracker, sinks=sinks, batch_size=args.batch_size,
+                                overlay_every=args.overlay_every)
+    pipeline.frame_count = start_frame
+    pipeline.run()
+
+    if args.interpolate:
+        print_summary(interpolate_mot_file(args.mot_output, mode=args.interpolate, max_gap=args.max_gap))
+
+
+if __name__ == "__main__":
+    main()
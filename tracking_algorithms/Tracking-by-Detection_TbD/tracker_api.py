@@ -0,0 +1,393 @@
+"""
+tracker_api.py
+--------------
+Common tracker interface for the Tracking-by-Detection (TbD) drivers.
+
+Author: Dr. Amit Chougule, PhD
+Date: 2026-10-19
+
+Description:
+    Every tracker in this folder is wrapped behind the same small protocol:
+
+        tracks = tracker.update(detections, frame)
+
+    where `detections` is an (N, 6) array of [x1, y1, x2, y2, score, class_id]
+    (5-column input is treated as class 0) and `tracks` is an (M, 6) array of
+    [x1, y1, x2, y2, track_id, class_id]. The adapters translate to and from the
+    native formats of SORT (Alex Bewley), ByteTrack (Supervision) and DeepSORT
+    (deep_sort_realtime), so capture, detection, drawing and timing only have to
+    be written once (see pipeline.py).
+
+    Association never crosses classes: SORT partitions its IoU matrices by class
+    natively, ByteTrack and DeepSORT run one tracker instance per class
+    (`ClassPartitionedTracker`) with track IDs kept unique across classes.
+
+    Backends are imported lazily: only the chosen tracker's library must be installed.
+
+    All adapters expose `state_dict()` / `load_state_dict(state)` with numpy-array
+    values so their full state can be snapshotted and resumed (see checkpoint.py).
+
+Dependencies:
+    pip install numpy filterpy scipy        # SORT
+    pip install supervision                 # ByteTrack
+    pip install deep-sort-realtime          # DeepSORT
+"""
+
+import os
+import sys
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+# --- Make Alex_Bewley_SORT importable from the SORT folder ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SORT_DIR = os.path.join(CURRENT_DIR, "SORT")
+if SORT_DIR not in sys.path:
+    sys.path.append(SORT_DIR)
+
+
+def as_detection_array(detections):
+    """Return detections as a float (N, 6) array of [x1, y1, x2, y2, score, class_id]."""
+    dets = np.asarray(detections, dtype=float)
+    if dets.size == 0:
+        return np.empty((0, 6))
+    dets = dets.reshape(-1, dets.shape[-1])
+    if dets.shape[1] == 5:
+        return np.column_stack((dets, np.zeros(len(dets))))
+    return dets[:, :6]
+
+
+def empty_tracks():
+    return np.empty((0, 6))
+
+
+@runtime_checkable
+class Tracker(Protocol):
+    """Interface shared by all tracker adapters (which also expose `max_age`, the frames a lost track keeps its ID)."""
+
+    name: str
+
+    def update(self, detections, frame=None):
+        """Consume one frame of detections and return the (M, 6) array of active tracks."""
+        ...
+
+
+class SortTracker:
+    """Alex Bewley's SORT (Kalman + IoU)."""
+
+    name = "SORT"
+
+    def __init__(self, max_age=30, min_hits=3, iou_threshold=0.3):
+        from Alex_Bewley_SORT import Sort
+
+        self.max_age = max_age
+        self.tracker = Sort(max_age=max_age, min_hits=min_hits, iou_threshold=iou_threshold)
+
+    def update(self, detections, frame=None):
+        return self.tracker.update(as_detection_array(detections))
+
+    def state_dict(self):
+        return self.tracker.state_dict()
+
+    def load_state_dict(self, state):
+        self.tracker.load_state_dict(state)
+
+
+class ClassPartitionedTracker:
+    """
+    Runs one single-class tracker per class id (created on first sight by `factory`)
+    and merges their outputs. Per-partition IDs are remapped to IDs unique across classes;
+    mappings not used for `id_ttl` frames are dropped. By default `id_ttl` is the partitions'
+    `max_age` (frames a lost track may come back with its ID) plus `id_ttl_margin`.
+    """
+
+    id_ttl_margin = 30
+
+    def __init__(self, factory, name, max_age=30, id_ttl=None):
+        self.factory = factory
+        self.name = name
+        self.max_age = max_age
+        self.id_ttl = id_ttl if id_ttl is not None else max_age + self.id_ttl_margin
+        self.partitions = {}
+        self._id_map = {}       # (class_id, local_id) -> [global_id, last_seen_frame]
+        self._next_id = 1
+        self._frame = 0
+
+    def _global_ids(self, class_id, local_ids):
+        ids = np.empty(len(local_ids))
+        for i, local_id in enumerate(local_ids):
+            key = (class_id, int(local_id))
+            entry = self._id_map.get(key)
+            if entry is None:
+                entry = self._id_map[key] = [self._next_id, self._frame]
+                self._next_id += 1
+            entry[1] = self._frame
+            ids[i] = entry[0]
+        return ids
+
+    def _prune_id_map(self):
+        oldest = self._frame - self.id_ttl
+        self._id_map = {key: entry for key, entry in self._id_map.items() if entry[1] > oldest}
+
+    def update(self, detections, frame=None):
+        self._frame += 1
+        dets = as_detection_array(detections)
+        classes = dets[:, 5].astype(int)
+        for class_id in np.unique(classes):
+            if class_id not in self.partitions:
+                self.partitions[class_id] = self.factory()
+
+        # every partition is stepped each frame (even without detections) so its tracks age correctly
+        outputs = []
+        for class_id, tracker in self.partitions.items():
+            tracks = tracker.update(dets[classes == class_id], frame)
+            if len(tracks) == 0:
+                continue
+            outputs.append(np.column_stack((tracks[:, :4], self._global_ids(class_id, tracks[:, 4]),
+                                            np.full(len(tracks), class_id))))
+        if self._frame % self.id_ttl == 0:
+            self._prune_id_map()
+        return np.concatenate(outputs) if outputs else empty_tracks()
+
+    def state_dict(self):
+        """
+        Each partition's arrays are stored under a "p<class_id>_" prefix; the ID remapping is a
+        plain (K, 4) [class_id, local_id, global_id, last_seen] array.
+        """
+        state = {
+            "partition_classes": np.array(list(self.partitions), dtype=np.int64),
+            "id_map": np.array([[c, local_id, global_id, last_seen]
+                                for (c, local_id), (global_id, last_seen) in self._id_map.items()],
+                               dtype=np.int64).reshape((-1, 4)),
+            "next_id": np.array(self._next_id, dtype=np.int64),
+            "frame": np.array(self._frame, dtype=np.int64),
+        }
+        for class_id, partition in self.partitions.items():
+            for key, value in partition.get_state().items():
+                state[f"p{class_id}_{key}"] = value
+        return state
+
+    def load_state_dict(self, state):
+        if "partition_states" in state:
+            raise ValueError("Snapshot holds pickled tracker objects (old format); it cannot be loaded safely")
+        self.partitions = {}
+        for class_id in state["partition_classes"].tolist():
+            prefix = f"p{class_id}_"
+            self.partitions[class_id] = self.factory()
+            self.partitions[class_id].set_state({key[len(prefix):]: value for key, value in state.items()
+                                                 if key.startswith(prefix)})
+        self._frame = int(state["frame"]) if "frame" in state else 0
+        # snapshots written before the ID TTL have (K, 3) maps; their entries count as seen now
+        id_map = state["id_map"]
+        if id_map.shape[1] == 3:
+            id_map = np.column_stack((id_map, np.full(len(id_map), self._frame, dtype=np.int64)))
+        self._id_map = {(c, local_id): [global_id, last_seen]
+                        for c, local_id, global_id, last_seen in id_map.tolist()}
+        self._next_id = int(state["next_id"])
+
+
+def _pack_features(groups, dim):
+    """Concatenate a list of (k_i, dim) feature lists into one array plus per-group lengths."""
+    lengths = np.array([len(group) for group in groups], dtype=np.int64)
+    rows = [np.asarray(f, dtype=np.float32).ravel() for group in groups for f in group]
+    return lengths, np.array(rows, dtype=np.float32).reshape((-1, dim))
+
+
+def _unpack_features(lengths, features):
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(int)
+    return [list(features[offsets[i]:offsets[i + 1]]) for i in range(len(lengths))]
+
+
+class _ByteTrackPartition:
+    """Single-class Supervision ByteTrack; returns (M, 5) [x1, y1, x2, y2, local_id]."""
+
+    max_removed_tracks = 1000  # removed tracks are only kept to filter duplicates; older ones are dropped
+
+    def __init__(self, **kwargs):
+        import supervision as sv
+
+        self._sv = sv
+        self.tracker = sv.ByteTrack(**kwargs)
+
+    def update(self, dets, frame=None):
+        sv_detections = self._sv.Detections(
+            xyxy=dets[:, :4].astype(np.float32),
+            confidence=dets[:, 4].astype(np.float32),
+            class_id=dets[:, 5].astype(int),
+        )
+        tracked = self.tracker.update_with_detections(sv_detections)
+        removed = getattr(self.tracker, "removed_tracks", None)
+        if removed is not None and len(removed) > self.max_removed_tracks:
+            del removed[:-self.max_removed_tracks]
+        if len(tracked) == 0 or tracked.tracker_id is None:
+            return np.empty((0, 5))
+        return np.column_stack((tracked.xyxy, tracked.tracker_id)).astype(float)
+
+    def get_state(self):
+        """
+        Kalman means / covariances, boxes, scores and counters of every track (STrack) as arrays;
+        "tracked", "lost" and "removed" index into them, since a track can sit in two lists at once.
+        """
+        bt = self.tracker
+        tracks, index = [], {}
+        for track in bt.tracked_tracks + bt.lost_tracks + bt.removed_tracks:
+            if id(track) not in index:
+                index[id(track)] = len(tracks)
+                tracks.append(track)
+        n = len(tracks)
+        # every listed track has been activated, so its Kalman state is set
+        return {
+            "frame_id": np.array(bt.frame_id, dtype=np.int64),
+            "id_counters": np.array([bt.internal_id_counter._id, bt.external_id_counter._id], dtype=np.int64),
+            "mean": np.array([t.mean for t in tracks], dtype=float).reshape((n, 8)),
+            "covariance": np.array([t.covariance for t in tracks], dtype=float).reshape((n, 8, 8)),
+            "tlwh": np.array([t._tlwh for t in tracks], dtype=np.float32).reshape((n, 4)),
+            "score": np.array([t.score for t in tracks], dtype=float),
+            "counters": np.array([[t.state.value, t.is_activated, t.start_frame, t.frame_id, t.tracklet_len,
+                                   t.internal_track_id, t.external_track_id] for t in tracks],
+                                 dtype=np.int64).reshape((n, 7)),
+            "tracked": np.array([index[id(t)] for t in bt.tracked_tracks], dtype=np.int64),
+            "lost": np.array([index[id(t)] for t in bt.lost_tracks], dtype=np.int64),
+            "removed": np.array([index[id(t)] for t in bt.removed_tracks], dtype=np.int64),
+        }
+
+    def set_state(self, state):
+        from supervision.tracker.byte_tracker.single_object_track import STrack, TrackState
+
+        bt = self.tracker
+        bt.frame_id = int(state["frame_id"])
+        bt.internal_id_counter._id, bt.external_id_counter._id = state["id_counters"].tolist()
+        tracks = []
+        for mean, covariance, tlwh, score, counters in zip(state["mean"], state["covariance"], state["tlwh"],
+                                                          state["score"], state["counters"].tolist()):
+            track = STrack(tlwh, float(score), bt.minimum_consecutive_frames, bt.shared_kalman,
+                           bt.internal_id_counter, bt.external_id_counter)
+            track.kalman_filter = bt.kalman_filter
+            track.mean, track.covariance = mean.copy(), covariance.copy()
+            (state_value, is_activated, track.start_frame, track.frame_id, track.tracklet_len,
+             track.internal_track_id, track.external_track_id) = counters
+            track.state = TrackState(state_value)
+            track.is_activated = bool(is_activated)
+            tracks.append(track)
+        bt.tracked_tracks = [tracks[i] for i in state["tracked"].tolist()]
+        bt.lost_tracks = [tracks[i] for i in state["lost"].tolist()]
+        bt.removed_tracks = [tracks[i] for i in state["removed"].tolist()]
+
+
+class _DeepSortPartition:
+    """Single-class deep_sort_realtime DeepSort; returns (M, 5) [x1, y1, x2, y2, local_id]."""
+
+    def __init__(self, **kwargs):
+        from deep_sort_realtime.deepsort_tracker import DeepSort
+
+        self.tracker = DeepSort(**kwargs)
+
+    def update(self, dets, frame=None):
+        # Convert to DeepSORT format ((x, y, w, h), conf, class)
+        w = dets[:, 2] - dets[:, 0]
+        h = dets[:, 3] - dets[:, 1]
+        keep = (w > 0) & (h > 0)
+        formatted_detections = [
+            ((float(x), float(y), float(bw), float(bh)), float(conf), int(cls))
+            for x, y, bw, bh, conf, cls in zip(dets[keep, 0], dets[keep, 1], w[keep], h[keep],
+                                               dets[keep, 4], dets[keep, 5])
+        ]
+
+        tracks = self.tracker.update_tracks(formatted_detections, frame=frame)
+        rows = [[*track.to_ltrb(), int(track.track_id)] for track in tracks if track.is_confirmed()]
+        return np.array(rows, dtype=float) if rows else np.empty((0, 5))
+
+    def get_state(self):
+        """
+        Tracks (Kalman mean / covariance, ID, hit and age counters, pending features), the appearance
+        galleries (metric.samples) and the ID counter as arrays; the CNN embedder is not saved.
+        Per-detection metadata (original box, confidence, mask) is refreshed on every update and not kept.
+        """
+        tracker = self.tracker.tracker
+        tracks, samples = tracker.tracks, tracker.metric.samples
+        all_features = [f for t in tracks for f in t.features] + [f for g in samples.values() for f in g]
+        dim = np.size(all_features[0]) if all_features else 0
+        feature_len, features = _pack_features([t.features for t in tracks], dim)
+        sample_len, sample_features = _pack_features(list(samples.values()), dim)
+        n = len(tracks)
+        return {
+            "next_id": np.array(tracker._next_id, dtype=np.int64),
+            "mean": np.array([t.mean for t in tracks], dtype=float).reshape((n, 8)),
+            "covariance": np.array([t.covariance for t in tracks], dtype=float).reshape((n, 8, 8)),
+            # a freshly initiated track keeps the float32 mean of its first detection until updated
+            "counters": np.array([[int(t.track_id), t.hits, t.age, t.time_since_update, t.state,
+                                   t.mean.dtype == np.float32] for t in tracks], dtype=np.int64).reshape((n, 6)),
+            "feature_len": feature_len,
+            "features": features,
+            "sample_targets": np.array([int(k) for k in samples], dtype=np.int64),
+            "sample_len": sample_len,
+            "samples": sample_features,
+        }
+
+    def set_state(self, state):
+        tracker = self.tracker.tracker
+        tracker._next_id = int(state["next_id"])
+        features = _unpack_features(state["feature_len"], state["features"])
+        tracker.tracks = []
+        for mean, covariance, counters, track_features in zip(state["mean"], state["covariance"],
+                                                              state["counters"].tolist(), features):
+            track_id, hits, age, time_since_update, track_state, float32_mean = counters
+            mean = mean.astype(np.float32 if float32_mean else float)
+            track = tracker.track_class(mean, covariance.copy(), str(track_id), tracker.n_init, tracker.max_age)
+            track.hits, track.age, track.time_since_update, track.state = hits, age, time_since_update, track_state
+            track.features = track_features
+            tracker.tracks.append(track)
+        # deep_sort keys the galleries by the string track IDs it hands out
+        tracker.metric.samples = dict(zip(map(str, state["sample_targets"].tolist()),
+                                          _unpack_features(state["sample_len"], state["samples"])))
+
+
+class ByteTrackTracker(ClassPartitionedTracker):
+    """ByteTrack from the Supervision library; keyword arguments go to `sv.ByteTrack`."""
+
+    name = "ByteTrack"
+
+    def __init__(self, **kwargs):
+        # sv.ByteTrack drops lost tracks after lost_track_buffer frames, scaled to its frame rate
+        max_age = int(kwargs.get("frame_rate", 30) / 30.0 * kwargs.get("lost_track_buffer", 30))
+        super().__init__(lambda: _ByteTrackPartition(**kwargs), self.name, max_age=max_age)
+
+
+class DeepSortTracker(ClassPartitionedTracker):
+    """
+    DeepSORT from deep_sort_realtime; needs the frame for appearance embeddings.
+    `nn_budget` bounds the appearance gallery kept per track (unbounded in deep_sort_realtime by default).
+    """
+
+    name = "DeepSORT"
+
+    def __init__(self, max_age=30, n_init=2, nms_max_overlap=1.0, max_cosine_distance=0.3, nn_budget=100,
+                 **kwargs):
+        kwargs.update(max_age=max_age, n_init=n_init, nms_max_overlap=nms_max_overlap,
+                      max_cosine_distance=max_cosine_distance, nn_budget=nn_budget)
+        self._kwargs = kwargs
+        super().__init__(self._new_partition, self.name, max_age=max_age)
+
+    def _new_partition(self):
+        if not self.partitions:
+            return _DeepSortPartition(**self._kwargs)
+        # reuse the first partition's appearance model instead of loading one CNN per class
+        partition = _DeepSortPartition(**dict(self._kwargs, embedder=None))
+        partition.tracker.embedder = next(iter(self.partitions.values())).tracker.embedder
+        return partition
+
+
+TRACKERS = {
+    "sort": SortTracker,
+    "bytetrack": ByteTrackTracker,
+    "deepsort": DeepSortTracker,
+}
+
+
+def build_tracker(name, **kwargs):
+    """Instantiate a registered tracker adapter by name (case-insensitive)."""
+    try:
+        tracker_cls = TRACKERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown tracker '{name}'. Available: {', '.join(sorted(TRACKERS))}") from None
+    return tracker_cls(**kwargs)